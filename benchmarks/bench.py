@@ -0,0 +1,279 @@
+"""
+Benchmark runner with JSON history and regression comparison
+
+    python -m benchmarks.bench run [--preset default --preset wide ...]
+    python -m benchmarks.bench compare [BASE] [HEAD] [--threshold 0.1]
+    python -m benchmarks.bench startup [--max-ms 100]
+"""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import typer
+
+from benchmarks.generate import PRESETS, generate_preset
+
+ROOT = Path(__file__).resolve().parent
+DATA_DIR = ROOT / "data"
+HISTORY = ROOT / "history.json"
+STAGES = ("read_csv_rows", "profile_rows", "profile_file", "build_markdown_report", "cli")
+# Optional heavy dependencies that must not load just by importing the CLI.
+LAZY_MODULES = ("pandas", "numpy", "pyarrow", "streamlit", "rich")
+
+app = typer.Typer(help="CSV Profiler benchmarks")
+
+
+def _peak_rss_mb(usage: resource.struct_rusage) -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1 << 20 if sys.platform == "darwin" else 1 << 10
+    return usage.ru_maxrss / scale
+
+
+def _env() -> Dict[str, str]:
+    # measure the working tree, not whatever version happens to be installed
+    env = dict(os.environ)
+    src = str(ROOT.parent / "src")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, str(ROOT.parent), env.get("PYTHONPATH")) if p)
+    return env
+
+
+def _measure(args: List[str]) -> Dict[str, Any]:
+    """
+    Run a child process and return its wall time, stdout and peak RSS.
+    wait4 gives the child's own rusage; RUSAGE_CHILDREN would only report
+    the largest child so far.
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=_env())
+    out = proc.stdout.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    seconds = time.perf_counter() - t0
+    if proc.returncode:
+        raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}")
+    return {"seconds": seconds, "peak_rss_mb": _peak_rss_mb(usage), "stdout": out.decode()}
+
+
+@app.command(hidden=True)
+def stage(name: str, csv_path: Path, repeat: int = 3) -> None:
+    """Time one library stage in this process and print JSON (used by `run`)."""
+    from csv_profiler.io import read_csv_rows
+    from csv_profiler.profiling import profile_rows
+    from csv_profiler.render import build_markdown_report
+    from csv_profiler.streaming import profile_file
+
+    rows = read_csv_rows(str(csv_path)) if name in ("profile_rows", "build_markdown_report") else None
+    profile = profile_rows(rows) if name == "build_markdown_report" else None
+    calls = {
+        "read_csv_rows": lambda: read_csv_rows(str(csv_path)),
+        "profile_rows": lambda: profile_rows(rows),
+        "profile_file": lambda: profile_file(str(csv_path)),
+        "build_markdown_report": lambda: build_markdown_report(profile),
+    }
+    call = calls[name]
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - t0)
+    typer.echo(json.dumps({"seconds": best}))
+
+
+def bench_dataset(csv_path: Path, n_rows: int, stages: List[str], repeat: int) -> Dict[str, Any]:
+    """Time each stage on one file; every stage runs in a fresh process so peak RSS is per stage."""
+    n_bytes = csv_path.stat().st_size
+    results: Dict[str, Any] = {}
+    for name in stages:
+        if name == "cli":
+            with tempfile.TemporaryDirectory() as out_dir:
+                best: Optional[Dict[str, Any]] = None
+                for _ in range(repeat):
+                    m = _measure([sys.executable, "-m", "csv_profiler.cli", "profile", str(csv_path),
+                                  "-o", out_dir, "--no-cache"])
+                    if best is None or m["seconds"] < best["seconds"]:
+                        best = m
+            seconds, rss = best["seconds"], best["peak_rss_mb"]
+        else:
+            m = _measure([sys.executable, "-m", "benchmarks.bench", "stage", name, str(csv_path),
+                          "--repeat", str(repeat)])
+            seconds, rss = json.loads(m["stdout"])["seconds"], m["peak_rss_mb"]
+        results[name] = {
+            "seconds": seconds,
+            "rows_per_s": n_rows / seconds if seconds else None,
+            "mb_per_s": n_bytes / (1 << 20) / seconds if seconds else None,
+            "peak_rss_mb": rss,
+        }
+    return {"file": csv_path.name, "rows": n_rows, "bytes": n_bytes, "stages": results}
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: Path = HISTORY) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_history(history: List[Dict[str, Any]], path: Path = HISTORY) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(history, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+@app.command()
+def generate(
+    preset: str = typer.Argument("default", help=f"One of: {', '.join(PRESETS)}"),
+    rows: int = typer.Option(None, "--rows", help="Override the preset's row count"),
+    columns: int = typer.Option(None, "--columns", help="Override the preset's column count"),
+    seed: int = typer.Option(None, "--seed", help="Override the generator seed"),
+) -> None:
+    """Generate (or reuse) a synthetic dataset and print its path."""
+    if preset not in PRESETS:
+        raise typer.BadParameter(f"preset must be one of: {', '.join(PRESETS)}")
+    typer.echo(generate_preset(preset, DATA_DIR, rows=rows, columns=columns, seed=seed))
+
+
+@app.command()
+def run(
+    preset: List[str] = typer.Option(["default"], "--preset", "-p", help="Datasets to benchmark"),
+    rows: int = typer.Option(None, "--rows", help="Override every preset's row count"),
+    stage_names: List[str] = typer.Option(list(STAGES), "--stage", "-s", help="Stages to time"),
+    repeat: int = typer.Option(3, "--repeat", "-r", help="Runs per stage; the fastest is kept"),
+    label: str = typer.Option(None, "--label", help="Name for this run (default: git commit)"),
+    no_save: bool = typer.Option(False, "--no-save", help="Print results without adding them to the history"),
+) -> None:
+    """Benchmark each stage on each preset and append the results to the history."""
+    for name in preset:
+        if name not in PRESETS:
+            raise typer.BadParameter(f"preset must be one of: {', '.join(PRESETS)}")
+    for name in stage_names:
+        if name not in STAGES:
+            raise typer.BadParameter(f"stage must be one of: {', '.join(STAGES)}")
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    dirty = bool(_git("status", "--porcelain", "--", str(ROOT.parent / "src")))
+    entry: Dict[str, Any] = {
+        "label": label or (f"{commit}+dirty" if dirty else commit) or "unknown",
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "datasets": {},
+    }
+    for name in preset:
+        csv_path = generate_preset(name, DATA_DIR, rows=rows)
+        n_rows = rows if rows is not None else PRESETS[name]["rows"]
+        typer.echo(f"{name}: {csv_path.name}")
+        result = bench_dataset(csv_path, n_rows, stage_names, repeat)
+        entry["datasets"][name] = result
+        for stage_name, r in result["stages"].items():
+            typer.echo(f"  {stage_name:<22} {r['seconds'] * 1000:10.2f}ms {r['rows_per_s']:12.0f} rows/s "
+                       f"{r['mb_per_s']:8.2f} MB/s {r['peak_rss_mb']:8.1f} MB RSS")
+
+    if not no_save:
+        history = load_history()
+        history.append(entry)
+        save_history(history)
+        typer.echo(f"Saved as {entry['label']} to {HISTORY}")
+
+
+def _find(history: List[Dict[str, Any]], ref: str) -> Dict[str, Any]:
+    for entry in reversed(history):
+        if ref in (entry["label"], entry["commit"]):
+            return entry
+    raise typer.BadParameter(f"No benchmark run labelled {ref}")
+
+
+@app.command()
+def compare(
+    base: str = typer.Argument(None, help="Baseline run label or commit (default: second to last run)"),
+    head: str = typer.Argument(None, help="Run to check (default: last run)"),
+    threshold: float = typer.Option(0.10, "--threshold", "-t", help="Flag slowdowns above this fraction"),
+    min_ms: float = typer.Option(5.0, "--min-ms", help="Ignore slowdowns smaller than this many milliseconds"),
+) -> None:
+    """Compare two runs stage by stage; exits 1 when any stage regressed."""
+    history = load_history()
+    if len(history) < 2 and (base is None or head is None):
+        raise typer.BadParameter("Need at least two runs in the history")
+    new = _find(history, head) if head else history[-1]
+    old = _find(history, base) if base else history[-2]
+
+    typer.echo(f"{old['label']} -> {new['label']}")
+    regressions = 0
+    for name, dataset in new["datasets"].items():
+        before = old["datasets"].get(name)
+        if before is None or before["bytes"] != dataset["bytes"]:
+            typer.echo(f"{name}: not comparable (dataset differs)")
+            continue
+        typer.echo(f"{name}:")
+        for stage_name, r in dataset["stages"].items():
+            prev = before["stages"].get(stage_name)
+            if prev is None:
+                continue
+            change = r["seconds"] / prev["seconds"] - 1
+            rss = r["peak_rss_mb"] - prev["peak_rss_mb"]
+            flag = ""
+            if change > threshold and (r["seconds"] - prev["seconds"]) * 1000 >= min_ms:
+                flag = "  REGRESSION"
+                regressions += 1
+            typer.echo(f"  {stage_name:<22} {prev['seconds'] * 1000:10.2f}ms -> {r['seconds'] * 1000:10.2f}ms "
+                       f"({change:+.1%}, RSS {rss:+.1f} MB){flag}")
+
+    if regressions:
+        typer.echo(f"{regressions} stage(s) slower by more than {threshold:.0%}")
+        raise typer.Exit(code=1)
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds per module, from python -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_env(), check=True,
+    )
+    times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+@app.command()
+def startup(
+    module: str = typer.Option("csv_profiler.cli", "--module", help="Module whose import is timed"),
+    max_ms: float = typer.Option(100.0, "--max-ms", help="Fail when importing the module takes longer"),
+    repeat: int = typer.Option(5, "--repeat", "-r", help="Imports to time; the fastest is kept"),
+) -> None:
+    """Check the CLI's import time and that no heavy optional dependency is imported eagerly."""
+    runs = [import_times(module) for _ in range(repeat)]
+    best = min(runs, key=lambda t: t.get(module, 0))
+    total_ms = best.get(module, 0) / 1000
+    typer.echo(f"import {module}: {total_ms:.1f}ms (limit {max_ms:.0f}ms)")
+    for name, us in sorted(best.items(), key=lambda item: item[1], reverse=True)[1:11]:
+        typer.echo(f"  {name:<40} {us / 1000:8.1f}ms")
+
+    eager = [m for m in LAZY_MODULES if m in best]
+    if eager:
+        typer.echo(f"Imported eagerly: {', '.join(eager)}")
+    if eager or total_ms > max_ms:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
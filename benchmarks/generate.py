@@ -0,0 +1,99 @@
+"""
+Deterministic synthetic CSV generator for benchmarks
+"""
+
+import csv
+import random
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+KINDS = ("integer", "number", "boolean", "date", "datetime", "text")
+MISSING_TOKENS = ("", "NA", "null")
+
+# Named datasets used by `bench run`; any field can be overridden from the command line.
+PRESETS: Dict[str, Dict[str, Any]] = {
+    "default": {"rows": 100_000, "columns": 12},
+    "quoted": {"rows": 50_000, "columns": 8, "kinds": ("text",), "quoted": 0.3, "multiline": 0.05},
+    "wide": {"rows": 2_000, "columns": 1_000},
+    "high-cardinality": {"rows": 100_000, "columns": 6, "kinds": ("text", "integer"), "cardinality": 1_000_000},
+}
+
+
+def _value_maker(kind: str, rng: random.Random, cardinality: int, quoted: float, multiline: float) -> Callable[[], str]:
+    start = date(2020, 1, 1)
+    if kind == "integer":
+        return lambda: str(rng.randrange(cardinality))
+    if kind == "number":
+        return lambda: repr(rng.randrange(cardinality) / 7)
+    if kind == "boolean":
+        return lambda: rng.choice(("true", "false"))
+    if kind == "date":
+        return lambda: (start + timedelta(days=rng.randrange(min(cardinality, 3650)))).isoformat()
+    if kind == "datetime":
+        base = datetime(2020, 1, 1)
+        return lambda: (base + timedelta(seconds=rng.randrange(cardinality) * 37)).isoformat()
+
+    def text() -> str:
+        value = f"v{rng.randrange(cardinality)}"
+        r = rng.random()
+        if r < multiline:
+            return value + "\nsecond line"
+        if r < multiline + quoted:
+            return f'{value}, with "quotes"'
+        return value
+
+    return text
+
+
+def generate_csv(
+    path: Path,
+    rows: int = 100_000,
+    columns: int = 12,
+    kinds: Sequence[str] = KINDS,
+    missing: float = 0.05,
+    cardinality: int = 1_000,
+    quoted: float = 0.0,
+    multiline: float = 0.0,
+    seed: int = 0,
+) -> Path:
+    """
+    Write a CSV with `rows` records and `columns` columns cycling through
+    `kinds`. A `missing` fraction of cells is a missing token, values are
+    drawn from `cardinality` distinct values, and a `quoted`/`multiline`
+    fraction of text cells contain commas and quotes or a newline.
+    The same arguments always produce the same bytes.
+    """
+    for kind in kinds:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind: {kind}")
+    rng = random.Random(seed)
+    column_kinds = [kinds[i % len(kinds)] for i in range(columns)]
+    makers = [_value_maker(k, rng, cardinality, quoted, multiline) for k in column_kinds]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow([f"{k}_{i}" for i, k in enumerate(column_kinds)])
+        rand = rng.random
+        for _ in range(rows):
+            row: List[str] = []
+            for make in makers:
+                if rand() < missing:
+                    row.append(rng.choice(MISSING_TOKENS))
+                else:
+                    row.append(make())
+            writer.writerow(row)
+    return path
+
+
+def generate_preset(name: str, out_dir: Path, **overrides: Any) -> Path:
+    """Generate a preset dataset into out_dir, reusing an existing file with the same parameters."""
+    params = {**PRESETS[name], **{k: v for k, v in overrides.items() if v is not None}}
+    tag = "-".join(f"{k}{v if not isinstance(v, tuple) else '+'.join(v)}" for k, v in sorted(params.items()))
+    path = out_dir / f"{name}-{tag}.csv"
+    if not path.exists():
+        tmp = path.with_suffix(".tmp")
+        generate_csv(tmp, **params)
+        tmp.replace(path)
+    return path
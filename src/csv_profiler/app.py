@@ -1,12 +1,78 @@
 import csv
+import hashlib
+import io
 import json
-from io import StringIO
+from collections import OrderedDict
+from itertools import islice
 
 import streamlit as st
 
-from csv_profiler.profiling import profile_rows
-from csv_profiler.render import write_markdown
-
+from csv_profiler.io import decompress_stream
+from csv_profiler.render import build_markdown_report
+from csv_profiler.streaming import accumulate_text
+
+PREVIEW_ROWS = 5
+MAX_CACHED_PROFILES = 32
+PAGE_SIZES = (25, 50, 100, 250)
+# Scalar fields shown in the column table; the rest is in the column detail view.
+SUMMARY_FIELDS = ("name", "type", "count", "missing", "missing_pct", "unique", "mean", "stddev")
+# Shown as text, since they hold numbers or ISO dates depending on the column type.
+RANGE_FIELDS = ("min", "max")
+
+
+def text_stream(uploaded):
+    """Decoded, decompressed view of the upload that leaves the upload itself open."""
+    uploaded.seek(0)
+    return io.TextIOWrapper(decompress_stream(uploaded), encoding="utf-8", errors="replace", newline="")
+
+
+def read_preview(uploaded, n: int = PREVIEW_ROWS):
+    f = text_stream(uploaded)
+    records = (r for r in csv.reader(f) if r)
+    header = next(records, [])
+    rows = [dict(zip(header, r)) for r in islice(records, n)]
+    f.detach()
+    return rows
+
+
+def upload_digest(uploaded) -> str:
+    """SHA-256 of the upload, hashed once per uploaded file instead of on every rerun."""
+    cached = st.session_state.get("upload_digest")
+    if cached is None or cached[0] != uploaded.file_id:
+        cached = (uploaded.file_id, hashlib.sha256(uploaded.getbuffer()).hexdigest())
+        st.session_state["upload_digest"] = cached
+    return cached[1]
+
+
+@st.cache_resource
+def profile_store() -> OrderedDict:
+    """
+    Profiles by upload digest, shared by all sessions. Filled outside any
+    cached function: st.cache_data would record the progress bar updates
+    and fail to replay them on the next rerun.
+    """
+    return OrderedDict()
+
+
+def cached_profile(digest: str, uploaded, on_progress=None):
+    """Profile of an upload, cached by its content hash."""
+    store = profile_store()
+    if digest in store:
+        store.move_to_end(digest)
+        return store[digest]
+    f = text_stream(uploaded)
+    table = accumulate_text(f, on_progress=on_progress)
+    f.detach()
+    profile = table.to_profile() if table is not None else {"rows": 0, "columns": 0, "column_profiles": []}
+    store[digest] = profile
+    while len(store) > MAX_CACHED_PROFILES:
+        store.popitem(last=False)
+    return profile
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_downloads(digest: str, _profile):
+    return json.dumps(_profile, indent=2, ensure_ascii=False), build_markdown_report(_profile)
 
 
 st.set_page_config(page_title="CSV Profiler", layout="wide")
@@ -16,48 +82,73 @@ st.title("CSV Profiler")
 st.sidebar.header("Upload CSV")
 uploaded = st.sidebar.file_uploader(
     "Upload CSV",
-    type=["csv"],
-    help="Upload a CSV file to profile",
+    type=["csv", "gz", "bz2", "zst"],
+    help="Upload a CSV file (optionally gzip/bz2/zstd compressed) to profile",
 )
 
 # ========== PREVIEW ==========
 if uploaded:
-    text = uploaded.getvalue().decode("utf-8", errors="replace")
-    rows = list(csv.DictReader(StringIO(text)))
+    digest = upload_digest(uploaded)
 
     st.subheader("Data Preview")
-    st.dataframe(rows[:5], use_container_width=True)
+    st.dataframe(read_preview(uploaded), use_container_width=True)
 
     if st.button("Generate Profile"):
-        st.session_state["profile"] = profile_rows(rows)
+        st.session_state["digest"] = digest
+elif "digest" in st.session_state:
+    del st.session_state["digest"]
 
 # ========== RESULTS ==========
-if "profile" in st.session_state:
-    profile = st.session_state["profile"]
+if uploaded and st.session_state.get("digest") == digest:
+    bar = st.progress(0.0, text="Profiling...")
+    size = max(uploaded.size, 1)
+
+    def on_progress(rows: int) -> None:
+        done = min(uploaded.tell() / size, 1.0)
+        bar.progress(done, text=f"Profiling... {rows:,} rows")
+
+    profile = cached_profile(digest, uploaded, on_progress)
+    bar.empty()
 
     st.subheader("Dataset Overview")
 
     c1, c2, c3 = st.columns(3)
-    c1.metric("Rows", profile["n_rows"])
-    c2.metric("Columns", profile["n_cols"])
+    c1.metric("Rows", profile["rows"])
+    c2.metric("Columns", profile["columns"])
     c3.metric(
         "Missing Cells",
-        sum(col["missing"] for col in profile["columns"]),
+        sum(col["missing"] for col in profile["column_profiles"]),
     )
 
     st.subheader("Column Details")
-    st.dataframe(profile["columns"], use_container_width=True)
 
-    st.subheader("Downloads")
+    columns = profile["column_profiles"]
+    query = st.text_input("Filter columns", placeholder="Column name contains...")
+    if query:
+        columns = [col for col in columns if query.casefold() in col["name"].casefold()]
+
+    p1, p2 = st.columns(2)
+    page_size = p1.selectbox("Columns per page", PAGE_SIZES)
+    n_pages = max(1, -(-len(columns) // page_size))
+    page = p2.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1)
+    page_columns = columns[(page - 1) * page_size:page * page_size]
+
+    table_rows = []
+    for col in page_columns:
+        row = {k: col.get(k) for k in SUMMARY_FIELDS}
+        for k in RANGE_FIELDS:
+            row[k] = None if col.get(k) is None else str(col[k])
+        table_rows.append(row)
+    st.dataframe(table_rows, use_container_width=True)
+
+    if page_columns:
+        names = [col["name"] for col in page_columns]
+        choice = st.selectbox("Column statistics", range(len(names)), format_func=lambda i: names[i])
+        st.json(page_columns[choice], expanded=False)
 
-    json_data = json.dumps(profile, indent=2, ensure_ascii=False)
+    st.subheader("Downloads")
 
-    # توليد Markdown بنفس renderer حقك
-    import tempfile, os
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".md") as tmp:
-        write_markdown(profile, tmp.name)
-        md_data = open(tmp.name, encoding="utf-8").read()
-        os.unlink(tmp.name)
+    json_data, md_data = cached_downloads(digest, profile)
 
     d1, d2 = st.columns(2)
     d1.download_button(
@@ -77,4 +168,3 @@ if "profile" in st.session_state:
 
 else:
     st.info("Upload a CSV file from the sidebar to begin")
-
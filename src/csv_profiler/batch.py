@@ -0,0 +1,283 @@
+"""
+Batch profiling of many CSV files
+"""
+
+import glob
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Sequence
+
+from .accumulators import FrequencyAccumulator
+from .cache import ProfileCache
+from .io import COMPRESSED_SUFFIXES, report_stem
+from .render import slugify, write_json, write_markdown
+from .snapshot import SNAPSHOT_SUFFIX, write_snapshot
+from .vectorized import accumulate_with_engine
+
+# One JSON line per finished file, appended as results arrive, so an
+# interrupted run can pick up where it stopped.
+JOURNAL_NAME = ".profile-many.jsonl"
+INDEX_NAME = "index"
+CSV_SUFFIXES = (".csv",) + tuple(".csv" + s for s in COMPRESSED_SUFFIXES)
+
+
+def expand_inputs(patterns: Sequence[str]) -> List[Path]:
+    """Resolve files, directories (searched recursively for CSV_SUFFIXES) and globs, without duplicates."""
+    found: Dict[str, Path] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(m for suffix in CSV_SUFFIXES for m in path.rglob(f"*{suffix}"))
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True))
+        for match in matches:
+            if match.is_file():
+                found.setdefault(os.path.abspath(match), match)
+    return list(found.values())
+
+
+def report_names(paths: Sequence[Path]) -> List[str]:
+    """
+    Per-file report base names, unique across directories.
+    Compressed files keep their format in the name (see io.report_stem);
+    names that still collide after slugifying get a numeric suffix in
+    input order.
+    """
+    absolute = [Path(os.path.abspath(p)) for p in paths]
+    root = Path(os.path.commonpath([p.parent for p in absolute])) if absolute else Path()
+    names = []
+    taken = set()
+    for p in absolute:
+        rel = p.relative_to(root).parent / report_stem(p)
+        base = name = "profile-" + "--".join(slugify(part) for part in rel.parts)
+        n = 1
+        while name in taken:
+            n += 1
+            name = f"{base}-{n}"
+        taken.add(name)
+        names.append(name)
+    return names
+
+
+def output_paths(out_dir: Path, base: str, formats: Collection[str]) -> List[Path]:
+    paths = []
+    if "json" in formats:
+        paths.append(out_dir / f"{base}.json")
+    if "markdown" in formats:
+        paths.append(out_dir / f"{base}.md")
+    if "binary" in formats:
+        paths.append(out_dir / f"{base}{SNAPSHOT_SUFFIX}")
+    return paths
+
+
+def read_journal(out_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Latest journal entry per input file; a torn last line is ignored."""
+    entries: Dict[str, Dict[str, Any]] = {}
+    path = out_dir / JOURNAL_NAME
+    if not path.exists():
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["file"]] = entry
+    return entries
+
+
+def compact_journal(out_dir: Path) -> None:
+    """Rewrite the journal keeping only the latest entry per file."""
+    entries = read_journal(out_dir)
+    tmp = out_dir / f"{JOURNAL_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for entry in entries.values():
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    os.replace(tmp, out_dir / JOURNAL_NAME)
+
+
+def is_up_to_date(
+    entry: Optional[Dict[str, Any]],
+    file_path: Path,
+    outputs: List[Path],
+    engine: str = "python",
+    settings: str = "exact",
+) -> bool:
+    """
+    True when the last run succeeded on this exact file version with the
+    same engine and settings, and its reports still exist.
+    """
+    if entry is None or entry.get("error") is not None:
+        return False
+    if (entry.get("engine"), entry.get("settings")) != (engine, settings):
+        return False
+    try:
+        st = file_path.stat()
+    except OSError:
+        return False
+    if (entry.get("size"), entry.get("mtime_ns")) != (st.st_size, st.st_mtime_ns):
+        return False
+    return sorted(entry.get("outputs", [])) == sorted(map(str, outputs)) and all(p.exists() for p in outputs)
+
+
+def profile_one(
+    file_path: Path,
+    outputs: List[Path],
+    engine: str = "python",
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+    settings: str = "exact",
+    cache_dir: Optional[Path] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """Profile one file and write its reports; errors are returned, not raised."""
+    entry: Dict[str, Any] = {
+        "file": os.path.abspath(file_path),
+        "size": None,
+        "mtime_ns": None,
+        "engine": engine,
+        "settings": settings,
+        "outputs": [str(p) for p in outputs],
+        "rows": None,
+        "columns": None,
+        "seconds": None,
+        "cache": None,
+        "error": None,
+    }
+    t0 = time.perf_counter()
+    try:
+        st = file_path.stat()
+        entry["size"] = st.st_size
+        entry["mtime_ns"] = st.st_mtime_ns
+
+        def compute(path):
+            return accumulate_with_engine(path, engine, 1, make_freq)
+
+        if use_cache:
+            table, entry["cache"] = ProfileCache(cache_dir).accumulate(file_path, settings, compute, make_freq, engine)
+        else:
+            table = compute(file_path)
+        data = table.to_profile() if table is not None else {"rows": 0, "columns": 0, "column_profiles": []}
+        for path in outputs:
+            if path.suffix == ".json":
+                write_json(data, str(path))
+            elif path.suffix == SNAPSHOT_SUFFIX:
+                write_snapshot(data, table, str(path), {"file": entry["file"], "settings": settings})
+            else:
+                write_markdown(data, str(path))
+        entry["rows"] = data["rows"]
+        entry["columns"] = data["columns"]
+    except Exception as exc:
+        entry["error"] = f"{type(exc).__name__}: {exc}"
+    entry["seconds"] = round(time.perf_counter() - t0, 6)
+    return entry
+
+
+def profile_many(
+    paths: Sequence[Path],
+    out_dir: Path,
+    formats: Collection[str] = ("json", "markdown"),
+    jobs: int = 1,
+    engine: str = "python",
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+    settings: str = "exact",
+    cache_dir: Optional[Path] = None,
+    use_cache: bool = True,
+    force: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Profile files in a pool of `jobs` processes, yielding one journal
+    entry per file as it finishes (skipped files first, marked "skipped").
+    Files whose reports are up to date are skipped unless force is set.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    journal = read_journal(out_dir)
+    todo = []
+    for path, base in zip(paths, report_names(paths)):
+        outputs = output_paths(out_dir, base, formats)
+        entry = journal.get(os.path.abspath(path))
+        if not force and is_up_to_date(entry, path, outputs, engine, settings):
+            yield {**entry, "skipped": True}
+        else:
+            todo.append((path, outputs))
+
+    if not todo:
+        return
+
+    with open(out_dir / JOURNAL_NAME, "a", encoding="utf-8") as log:
+        def record(entry: Dict[str, Any]) -> Dict[str, Any]:
+            log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            log.flush()
+            return {**entry, "skipped": False}
+
+        if jobs <= 1 or len(todo) == 1:
+            for path, outputs in todo:
+                yield record(profile_one(path, outputs, engine, make_freq, settings, cache_dir, use_cache))
+        else:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+
+            with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+                futures = [
+                    pool.submit(profile_one, path, outputs, engine, make_freq, settings, cache_dir, use_cache)
+                    for path, outputs in todo
+                ]
+                for fut in as_completed(futures):
+                    yield record(fut.result())
+
+    compact_journal(out_dir)
+
+
+def build_index(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summary of one profile-many run, in input order."""
+    ok = [e for e in entries if e["error"] is None]
+    return {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "files": len(entries),
+        "succeeded": len(ok),
+        "failed": len(entries) - len(ok),
+        "skipped": sum(1 for e in entries if e.get("skipped")),
+        "rows": sum(e["rows"] or 0 for e in ok),
+        "seconds": round(sum(e["seconds"] or 0 for e in entries if not e.get("skipped")), 6),
+        "entries": entries,
+    }
+
+
+def build_index_markdown(index: Dict[str, Any]) -> str:
+    """Markdown table for an index built by build_index()."""
+    lines = []
+    lines.append("# CSV Profiling Index")
+    lines.append("")
+    lines.append(f"Generated: {index['generated']}")
+    lines.append("")
+    lines.append(f"- **Files:** {index['files']}")
+    lines.append(f"- **Succeeded:** {index['succeeded']}")
+    lines.append(f"- **Failed:** {index['failed']}")
+    lines.append(f"- **Skipped (up to date):** {index['skipped']}")
+    lines.append(f"- **Rows:** {index['rows']}")
+    lines.append("")
+    lines.append("| File | Rows | Columns | Seconds | Status | Report |")
+    lines.append("|------|-----:|--------:|--------:|--------|--------|")
+    for e in index["entries"]:
+        if e["error"] is not None:
+            status = f"failed: {e['error']}".replace("|", "\\|")
+        else:
+            status = "skipped" if e.get("skipped") else "ok"
+        report = " ".join(Path(p).name for p in e["outputs"])
+        seconds = f"{e['seconds']:.3f}" if e["seconds"] is not None else ""
+        rows = e["rows"] if e["rows"] is not None else ""
+        columns = e["columns"] if e["columns"] is not None else ""
+        lines.append(f"| {e['file']} | {rows} | {columns} | {seconds} | {status} | {report} |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def write_index(index: Dict[str, Any], out_dir: Path) -> List[Path]:
+    json_path = out_dir / f"{INDEX_NAME}.json"
+    md_path = out_dir / f"{INDEX_NAME}.md"
+    write_json(index, str(json_path))
+    md_path.write_text(build_index_markdown(index), encoding="utf-8")
+    return [json_path, md_path]
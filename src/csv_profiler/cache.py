@@ -0,0 +1,176 @@
+"""
+Persistent profile cache
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .accumulators import TableAccumulator
+from .io import is_seekable
+from .snapshot import STATE_GLOBALS, StateUnpickler
+from .streaming import accumulate_range
+
+# Bump whenever the pickled accumulator layout changes.
+CACHE_VERSION = 1
+HASH_WINDOW = 64 << 10
+DEFAULT_MAX_BYTES = 512 << 20
+
+HIT = "hit"
+APPENDED = "appended"
+MISS = "miss"
+
+
+def default_cache_dir() -> Path:
+    """$CSV_PROFILER_CACHE_DIR, else $XDG_CACHE_HOME/csv-profiler, else ~/.cache/csv-profiler."""
+    env = os.environ.get("CSV_PROFILER_CACHE_DIR")
+    if env:
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "csv-profiler"
+
+
+def _digest(f, start: int, end: int) -> str:
+    f.seek(start)
+    return hashlib.sha256(f.read(end - start)).hexdigest()
+
+
+def fingerprint(file_path: str, offset: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Identify the first `offset` bytes of a file (default: all of it).
+    head hashes the leading window, tail the window just before offset;
+    appendable is False when the covered bytes do not end on a newline,
+    since appended bytes would then continue the last record, and for
+    compressed files, whose new bytes cannot be parsed on their own.
+    """
+    st = os.stat(file_path)
+    if offset is None:
+        offset = st.st_size
+    with open(file_path, "rb") as f:
+        head = _digest(f, 0, min(HASH_WINDOW, offset))
+        tail = _digest(f, max(0, offset - HASH_WINDOW), offset)
+        f.seek(max(0, offset - 1))
+        last = f.read(1) if offset else b""
+    return {
+        "size": offset,
+        "mtime_ns": st.st_mtime_ns,
+        "head": head,
+        "tail": tail,
+        "appendable": last in (b"", b"\n") and is_seekable(file_path),
+    }
+
+
+class ProfileCache:
+    """
+    On-disk store of table accumulators keyed by file path, settings,
+    engine and job count (engines differ in what they can report, and
+    chunked runs merge quantile sketches in a different order).
+    Entries are pickled next to the fingerprint of the bytes they cover
+    and loaded with the snapshot allow-list, so a shared cache directory
+    cannot be used to run code; least recently used entries are evicted
+    once max_bytes is exceeded.
+    """
+
+    __slots__ = ("root", "max_bytes")
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root) if root is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def entry_path(self, file_path: str, settings: str, engine: str = "python", jobs: int = 1) -> Path:
+        key = f"{os.path.abspath(file_path)}\0{settings}\0{engine}\0{jobs}".encode("utf-8", "surrogatepass")
+        return self.root / f"{hashlib.sha256(key).hexdigest()}.pkl"
+
+    def load(self, path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "rb") as f:
+                entry = StateUnpickler(f.read(), STATE_GLOBALS).load()
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+            return None
+        if not isinstance(entry.get("table"), (TableAccumulator, type(None))):
+            return None
+        # touch for LRU ordering; another process may have evicted it meanwhile
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def store(self, path: Path, fp: Dict[str, Any], table: TableAccumulator) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry = {"version": CACHE_VERSION, "fingerprint": fp, "table": table}
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for p in self.root.glob("*.pkl"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def accumulate(
+        self,
+        file_path: str,
+        settings: str,
+        compute: Callable[[str], Optional[TableAccumulator]],
+        make_freq: Callable[[], Any],
+        engine: str = "python",
+        jobs: int = 1,
+    ) -> Tuple[Optional[TableAccumulator], str]:
+        """
+        Return the file's table accumulator and how it was obtained.
+        A file with the same size, mtime and head/tail hashes is a HIT.
+        A file that only grew past a record boundary has just its new
+        bytes accumulated and merged (APPENDED). Anything else is
+        recomputed with compute(file_path) (MISS).
+        """
+        path = self.entry_path(file_path, settings, engine, jobs)
+        entry = self.load(path) if path.exists() else None
+        st = os.stat(file_path)
+
+        if entry is not None and entry["table"] is not None and st.st_size >= entry["fingerprint"]["size"]:
+            old = entry["fingerprint"]
+            table = entry["table"]
+            # size and mtime alone miss same-size rewrites that keep the mtime (cp -p, rsync -t)
+            fp = fingerprint(file_path, old["size"])
+            if fp["head"] == old["head"] and fp["tail"] == old["tail"]:
+                if st.st_size == old["size"] and st.st_mtime_ns == old["mtime_ns"]:
+                    return table, HIT
+                if st.st_size > old["size"] and old["appendable"]:
+                    header = [col.name for col in table.columns]
+                    table.merge(accumulate_range(file_path, header, old["size"], st.st_size, make_freq))
+                    self.store(path, fingerprint(file_path, st.st_size), table)
+                    return table, APPENDED
+
+        fp = fingerprint(file_path)
+        table = compute(file_path)
+        after = os.stat(file_path)
+        # a file written to while it was read must not be cached under the old fingerprint
+        if (after.st_size, after.st_mtime_ns) == (fp["size"], fp["mtime_ns"]):
+            self.store(path, fp, table)
+        return table, MISS
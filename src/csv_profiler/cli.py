@@ -3,67 +3,366 @@ Command-line interface for CSV Profiler.
 """
 
 import json
-import subprocess
-import sys
+import os
 import time
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
+from typing import Any, Callable, List, Set, Tuple
 
 import typer
 
-from csv_profiler.io import read_csv_rows
-from csv_profiler.profiling import profile_rows
-from csv_profiler.render import build_markdown_report
+from csv_profiler.io import STDIN, is_seekable, is_stdin, report_stem
+
+# Profiling modules are imported inside each command, so a run only
+# pays for what its command and options use (see benchmarks.bench startup).
 
 app = typer.Typer(help="CSV Profiler - Analyze and profile CSV files")
 
+FORMATS = ("json", "markdown", "binary")
+
+
+def parse_formats(format: str) -> Set[str]:
+    """Comma-separated output formats; both means json and markdown."""
+    formats = set()
+    for name in format.lower().split(","):
+        name = name.strip()
+        if name == "both":
+            formats.update(("json", "markdown"))
+        elif name in FORMATS:
+            formats.add(name)
+        else:
+            raise typer.BadParameter("format must be json, markdown, binary or both, optionally comma-separated")
+    return formats
+
+
+def frequency_settings(approx: bool, precision: int, capacity: int) -> Tuple[Callable[[], Any], str]:
+    """Value-count factory and its cache settings key; shared by profile and profile-many."""
+    from csv_profiler.accumulators import FrequencyAccumulator
+
+    if not approx:
+        return FrequencyAccumulator, "exact"
+    if not 4 <= precision <= 18:
+        raise typer.BadParameter("approx-precision must be between 4 and 18")
+    if capacity < 1:
+        raise typer.BadParameter("approx-capacity must be >= 1")
+    from csv_profiler.sketches import SketchFrequency
+
+    return partial(SketchFrequency, precision, capacity), f"approx:{precision}:{capacity}"
+
 
 @app.command()
 def profile(
-    file_path: Path = typer.Argument(..., help="Path to the CSV file to profile"),
+    file_path: Path = typer.Argument(..., help="Path to the CSV file to profile (plain, .gz, .bz2, .zst), or - for stdin"),
     out_dir: Path = typer.Option(Path("outputs"), "--out-dir", "-o", help="Output directory for reports"),
     report_name: str = typer.Option("profile", "--report-name", "-n", help="Report base name"),
-    format: str = typer.Option("both", "--format", "-f", help="Output format: json, markdown, or both"),
+    format: str = typer.Option("both", "--format", "-f", help="Output formats: json, markdown, binary (.cprof) or both; comma-separated"),
+    engine: str = typer.Option("python", "--engine", "-e", help="Profiling engine: python, pandas, or arrow"),
+    jobs: int = typer.Option(1, "--jobs", "-j", help="Worker processes (0 = all CPU cores)"),
+    approx: bool = typer.Option(False, "--approx", help="Use fixed-memory sketches for unique and top values (slower than exact on high-cardinality columns)"),
+    approx_precision: int = typer.Option(14, "--approx-precision", help="HyperLogLog precision (2**p registers per column)"),
+    approx_capacity: int = typer.Option(1024, "--approx-capacity", help="Top-value counters kept per column"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always profile from scratch and leave the cache untouched"),
+    cache_dir: Path = typer.Option(None, "--cache-dir", help="Cache directory (default: ~/.cache/csv-profiler)"),
+    cache_max_mb: int = typer.Option(512, "--cache-max-mb", help="Evict least recently used entries above this size"),
+    sample: int = typer.Option(None, "--sample", help="Profile a random sample of N rows"),
+    sample_fraction: float = typer.Option(None, "--sample-fraction", help="Profile a random fraction (0-1] of the rows"),
+    sample_mode: str = typer.Option("reservoir", "--sample-mode", help="reservoir (one full read) or seek (random byte offsets)"),
+    seed: int = typer.Option(None, "--seed", help="Random seed for sampling"),
+    validate_types: bool = typer.Option(False, "--validate-types", help="Type-check every row when sampling"),
+    stats: bool = typer.Option(False, "--stats", help="Print a time/memory breakdown and add it to the JSON metadata"),
+    profile_out: Path = typer.Option(None, "--profile-out", help="Write cProfile stats for the run to this file"),
 ) -> None:
     """Profile a CSV file and generate reports."""
-    if not file_path.exists():
+    from csv_profiler.render import build_markdown_report
+    from csv_profiler.vectorized import ENGINES, accumulate_with_engine, missing_requirement
+
+    from_stdin = is_stdin(file_path)
+    if not from_stdin and not file_path.exists():
         raise typer.BadParameter(f"File not found: {file_path}")
+    if from_stdin:
+        file_path = STDIN
 
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    fmt = format.lower().strip()
-    if fmt not in {"json", "markdown", "both"}:
-        raise typer.BadParameter("format must be one of: json, markdown, both")
+    formats = parse_formats(format)
+
+    engine = engine.lower().strip()
+    if engine not in ENGINES:
+        raise typer.BadParameter(f"engine must be one of: {', '.join(ENGINES)}")
+    if missing_requirement(engine):
+        raise typer.BadParameter(missing_requirement(engine))
+
+    if jobs < 0:
+        raise typer.BadParameter("jobs must be >= 0")
+    jobs = jobs or os.cpu_count() or 1
+
+    if engine != "python" and (jobs > 1 or approx):
+        raise typer.BadParameter("--jobs and --approx require the python engine")
+    if engine != "python" and from_stdin:
+        raise typer.BadParameter("reading stdin requires the python engine")
+
+    sampled = sample is not None or sample_fraction is not None
+    if sampled:
+        from csv_profiler.sampling import SAMPLE_MODES, profile_sample
+
+        if sample is not None and sample_fraction is not None:
+            raise typer.BadParameter("use only one of --sample and --sample-fraction")
+        if sample is not None and sample < 1:
+            raise typer.BadParameter("sample must be >= 1")
+        if sample_fraction is not None and not 0 < sample_fraction <= 1:
+            raise typer.BadParameter("sample-fraction must be in (0, 1]")
+        sample_mode = sample_mode.lower().strip()
+        if sample_mode not in SAMPLE_MODES:
+            raise typer.BadParameter(f"sample-mode must be one of: {', '.join(SAMPLE_MODES)}")
+        if engine != "python" or jobs > 1:
+            raise typer.BadParameter("--sample requires the python engine and a single job")
+        if sample_mode == "seek" and not is_seekable(file_path):
+            raise typer.BadParameter("--sample-mode seek needs an uncompressed file")
+
+    make_freq, settings = frequency_settings(approx, approx_precision, approx_capacity)
 
     base_name = report_name
     if report_name == "profile":
-        base_name = f"{report_name}-{file_path.stem}"
+        base_name = f"{report_name}-{report_stem(file_path)}"
 
     typer.echo(f"Profiling: {file_path}")
     t0 = time.perf_counter()
 
-    rows = read_csv_rows(file_path)
-    typer.echo(f"Read {len(rows)} rows")
+    run_stats = None
+    if stats:
+        from csv_profiler.instrument import Stats
+        from csv_profiler.streaming import accumulate_file_timed
 
-    data = profile_rows(rows)
+        run_stats = Stats()
+    profiler = None
+    if profile_out is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
 
-    if fmt in {"json", "both"}:
-        json_path = out_dir / f"{base_name}.json"
-        json_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-        typer.echo(f"JSON report saved to: {json_path}")
+    def stage(name):
+        return run_stats.stage(name) if run_stats is not None else nullcontext({})
+
+    def compute(path):
+        if run_stats is not None and engine == "python" and jobs <= 1:
+            return accumulate_file_timed(path, run_stats, make_freq)
+        with stage("profile") as counts:
+            result = accumulate_with_engine(path, engine, jobs, make_freq)
+            counts["rows"] = result.rows if result is not None else 0
+        return result
+
+    table = None
+    if sampled:
+        with stage("sample"):
+            data = profile_sample(file_path, sample, sample_fraction, sample_mode, seed, validate_types, make_freq)
+    else:
+        if no_cache or from_stdin:
+            table = compute(file_path)
+        else:
+            from csv_profiler.cache import ProfileCache
+
+            cache = ProfileCache(cache_dir, cache_max_mb << 20)
+            with stage("cache"):
+                table, status = cache.accumulate(file_path, settings, compute, make_freq, engine, jobs)
+            typer.echo(f"Cache: {status}")
+        with stage("summarize") as counts:
+            data = table.to_profile() if table is not None else {"rows": 0, "columns": 0, "column_profiles": []}
+            counts["rows"] = data["rows"]
+        if run_stats is not None and table is not None:
+            run_stats.set_column_memory(table.columns)
 
-    if fmt in {"markdown", "both"}:
+    typer.echo(f"Read {data['rows']} rows")
+    ragged = data.get("ragged_rows") or {}
+    if ragged.get("short") or ragged.get("long"):
+        typer.echo(f"Ragged rows: {ragged['short']} short, {ragged['long']} long")
+    if "sample" in data:
+        info = data["sample"]
+        total = info["rows_total"] if info["rows_total"] is not None else f"~{info['rows_estimated']}"
+        typer.echo(f"Sampled {info['rows_sampled']} of {total} rows ({info['mode']})")
+
+    if "markdown" in formats:
+        with stage("render_markdown") as counts:
+            markdown = build_markdown_report(data)
+            counts["bytes"] = len(markdown)
         md_path = out_dir / f"{base_name}.md"
-        md_path.write_text(build_markdown_report(data), encoding="utf-8")
+        with stage("write"):
+            md_path.write_text(markdown, encoding="utf-8")
         typer.echo(f"Markdown report saved to: {md_path}")
 
+    if "json" in formats:
+        with stage("render_json") as counts:
+            if run_stats is not None:
+                # stats up to here; JSON rendering and writing cannot time themselves
+                data["metadata"] = {"stats": run_stats.to_dict()}
+            text = json.dumps(data, ensure_ascii=False, indent=2)
+            counts["bytes"] = len(text)
+        json_path = out_dir / f"{base_name}.json"
+        with stage("write"):
+            json_path.write_text(text, encoding="utf-8")
+        typer.echo(f"JSON report saved to: {json_path}")
+
+    if "binary" in formats:
+        from csv_profiler.snapshot import SNAPSHOT_SUFFIX, write_snapshot
+
+        bin_path = out_dir / f"{base_name}{SNAPSHOT_SUFFIX}"
+        source = {"file": file_path if from_stdin else os.path.abspath(file_path), "settings": settings}
+        with stage("write_binary"):
+            write_snapshot(data, table, str(bin_path), source)
+        typer.echo(f"Binary profile saved to: {bin_path}")
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(str(profile_out))
+        typer.echo(f"cProfile stats saved to: {profile_out} (view with python -m pstats)")
+
     dt_ms = (time.perf_counter() - t0) * 1000
     typer.echo(f"Profiling took: {dt_ms:.2f}ms")
+    if run_stats is not None:
+        typer.echo("")
+        typer.echo(run_stats.format_table())
 
-    if __name__ == "__main__":
-    app()
+
+@app.command("profile-many")
+def profile_many(
+    inputs: List[str] = typer.Argument(..., help="CSV files, directories or glob patterns"),
+    out_dir: Path = typer.Option(Path("outputs"), "--out-dir", "-o", help="Output directory for reports and the index"),
+    format: str = typer.Option("both", "--format", "-f", help="Output formats: json, markdown, binary (.cprof) or both; comma-separated"),
+    engine: str = typer.Option("python", "--engine", "-e", help="Profiling engine: python, pandas, or arrow"),
+    jobs: int = typer.Option(0, "--jobs", "-j", help="Files profiled concurrently (0 = all CPU cores)"),
+    approx: bool = typer.Option(False, "--approx", help="Use fixed-memory sketches for unique and top values (slower than exact on high-cardinality columns)"),
+    approx_precision: int = typer.Option(14, "--approx-precision", help="HyperLogLog precision (2**p registers per column)"),
+    approx_capacity: int = typer.Option(1024, "--approx-capacity", help="Top-value counters kept per column"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always profile from scratch and leave the cache untouched"),
+    cache_dir: Path = typer.Option(None, "--cache-dir", help="Cache directory (default: ~/.cache/csv-profiler)"),
+    force: bool = typer.Option(False, "--force", help="Re-profile files whose reports are up to date"),
+) -> None:
+    """Profile many CSV files and write a summary index."""
+    from csv_profiler.batch import build_index, expand_inputs, profile_many as run_many, write_index
+    from csv_profiler.vectorized import ENGINES, missing_requirement
+
+    formats = parse_formats(format)
+
+    engine = engine.lower().strip()
+    if engine not in ENGINES:
+        raise typer.BadParameter(f"engine must be one of: {', '.join(ENGINES)}")
+    if missing_requirement(engine):
+        raise typer.BadParameter(missing_requirement(engine))
+    if engine != "python" and approx:
+        raise typer.BadParameter("--approx requires the python engine")
+
+    if jobs < 0:
+        raise typer.BadParameter("jobs must be >= 0")
+    jobs = jobs or os.cpu_count() or 1
+
+    paths = expand_inputs(inputs)
+    if not paths:
+        raise typer.BadParameter("no CSV files matched")
+
+    make_freq, settings = frequency_settings(approx, approx_precision, approx_capacity)
+
+    typer.echo(f"Profiling {len(paths)} files with {jobs} workers")
+    t0 = time.perf_counter()
+
+    entries = {}
+    for entry in run_many(paths, out_dir, formats, jobs, engine, make_freq, settings, cache_dir, not no_cache, force):
+        entries[entry["file"]] = entry
+        if entry["skipped"]:
+            status = "up to date"
+        elif entry["error"] is not None:
+            status = f"FAILED {entry['error']}"
+        else:
+            status = f"{entry['rows']} rows in {entry['seconds'] * 1000:.2f}ms"
+        typer.echo(f"[{len(entries)}/{len(paths)}] {entry['file']}: {status}")
+
+    index = build_index([entries[os.path.abspath(p)] for p in paths])
+    for path in write_index(index, out_dir):
+        typer.echo(f"Index saved to: {path}")
+
+    dt_ms = (time.perf_counter() - t0) * 1000
+    typer.echo(f"Profiled {index['files'] - index['skipped']} files, skipped {index['skipped']}, "
+               f"failed {index['failed']} in {dt_ms:.2f}ms")
+    if index["failed"]:
+        raise typer.Exit(code=1)
 
 
+@app.command()
+def diff(
+    old: Path = typer.Argument(..., help="Baseline profile (.cprof or JSON report)"),
+    new: Path = typer.Argument(..., help="Profile to check (.cprof or JSON report)"),
+    missing_threshold: float = typer.Option(5.0, "--missing-threshold", help="Flag missing-rate shifts of at least this many percentage points"),
+    drift_threshold: float = typer.Option(0.1, "--drift-threshold", help="Flag columns whose drift (KS or total variation, 0-1) reaches this"),
+    as_json: bool = typer.Option(False, "--json", help="Print the full comparison as JSON"),
+) -> None:
+    """Compare two profiles without re-reading the CSVs; exits 1 when anything changed."""
+    from csv_profiler.diff import diff_profiles, format_diff
+    from csv_profiler.snapshot import load_profile
 
+    for path in (old, new):
+        if not path.exists():
+            raise typer.BadParameter(f"File not found: {path}")
+    if missing_threshold < 0:
+        raise typer.BadParameter("missing-threshold must be >= 0")
+    if not 0 <= drift_threshold <= 1:
+        raise typer.BadParameter("drift-threshold must be between 0 and 1")
 
+    try:
+        profiles = [load_profile(str(path)) for path in (old, new)]
+    except (ValueError, OSError) as exc:
+        raise typer.BadParameter(str(exc))
 
+    result = diff_profiles(profiles[0], profiles[1], missing_threshold, drift_threshold)
+    if as_json:
+        typer.echo(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        typer.echo(format_diff(result))
+    if result["changes"]:
+        raise typer.Exit(code=1)
 
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Address to listen on"),
+    port: int = typer.Option(8765, "--port", "-p", help="TCP port to listen on"),
+    unix_socket: Path = typer.Option(None, "--unix-socket", help="Listen on this Unix socket instead of TCP"),
+    workers: int = typer.Option(0, "--workers", "-j", help="Worker processes (0 = all CPU cores)"),
+    queue_size: int = typer.Option(16, "--queue-size", help="Jobs allowed to wait for a worker; more are refused with 503"),
+    max_memory_mb: int = typer.Option(None, "--max-memory-mb", help="Address-space limit per worker process"),
+    max_upload_mb: int = typer.Option(1024, "--max-upload-mb", help="Largest accepted upload"),
+    spool_dir: Path = typer.Option(None, "--spool-dir", help="Directory for uploads waiting to be profiled (default: system temp)"),
+    root: List[Path] = typer.Option(None, "--root", help="Only profile path jobs under this directory (repeatable; needed to accept them on a non-loopback host)"),
+) -> None:
+    """Run the profiler as a local HTTP service with a job queue."""
+    import asyncio
+
+    from csv_profiler.server import serve as run_server
+
+    if workers < 0:
+        raise typer.BadParameter("workers must be >= 0")
+    if queue_size < 1:
+        raise typer.BadParameter("queue-size must be >= 1")
+    if max_memory_mb is not None and max_memory_mb < 1:
+        raise typer.BadParameter("max-memory-mb must be >= 1")
+    for path in root or []:
+        if not path.is_dir():
+            raise typer.BadParameter(f"Not a directory: {path}")
+    workers = workers or os.cpu_count() or 1
+
+    where = f"unix:{unix_socket}" if unix_socket else f"http://{host}:{port}"
+    typer.echo(f"Serving on {where} with {workers} workers (Ctrl+C to stop)")
+    try:
+        asyncio.run(run_server(
+            host, port, str(unix_socket) if unix_socket else None,
+            workers=workers,
+            queue_size=queue_size,
+            max_memory_mb=max_memory_mb,
+            max_upload_mb=max_upload_mb,
+            spool_dir=str(spool_dir) if spool_dir else None,
+            roots=[str(path) for path in root] if root else None,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    app()
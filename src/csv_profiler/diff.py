@@ -0,0 +1,228 @@
+"""
+Comparison of two profiles for data-quality gates
+"""
+
+import math
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .inference import BOOLEAN, INTEGER, NUMBER
+
+NUMERIC = (INTEGER, NUMBER)
+DEFAULT_MISSING_THRESHOLD = 5.0
+DEFAULT_DRIFT_THRESHOLD = 0.1
+# Columns with more distinct values than this fraction of their count are
+# treated as keys: their value distribution changes on every ingest.
+KEY_LIKE_RATIO = 0.5
+
+
+def _column_keys(profile: Dict[str, Any]) -> List[Tuple[str, int]]:
+    """(name, occurrence) per column, so duplicate header names still pair up in order."""
+    seen: Dict[str, int] = {}
+    keys = []
+    for col in profile["column_profiles"]:
+        n = seen.get(col["name"], 0)
+        seen[col["name"]] = n + 1
+        keys.append((col["name"], n))
+    return keys
+
+
+def _cdf(points: Sequence[Tuple[float, float]], x: float) -> float:
+    """Piecewise-linear CDF through (value, probability) points."""
+    values = [v for v, _ in points]
+    i = bisect_right(values, x)
+    if i == 0:
+        return 0.0
+    if i == len(points):
+        return 1.0
+    (v0, p0), (v1, p1) = points[i - 1], points[i]
+    return p0 + (p1 - p0) * (x - v0) / (v1 - v0) if v1 > v0 else p1
+
+
+def _quantile_points(col: Dict[str, Any]) -> Optional[List[Tuple[float, float]]]:
+    quantiles = col.get("quantiles") or {}
+    if col.get("min") is None or quantiles.get("p50") is None:
+        return None
+    points = [(col["min"], 0.0)]
+    points.extend((v, int(k[1:]) / 100) for k, v in quantiles.items() if v is not None)
+    points.append((col["max"], 1.0))
+    try:
+        # integer columns may hold values past the float range (10**400)
+        points = [(float(v), p) for v, p in points]
+    except OverflowError:
+        return None
+    if not all(math.isfinite(v) for v, _ in points):
+        return None
+    return points
+
+
+def quantile_ks(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[float]:
+    """Kolmogorov-Smirnov statistic estimated from the min, max and percentiles of two profiles."""
+    a = _quantile_points(old)
+    b = _quantile_points(new)
+    if a is None or b is None:
+        return None
+    # both CDFs are piecewise linear, so the largest gap is at a breakpoint;
+    # evaluate both there, since repeated percentiles make a point's own p a step
+    return max(abs(_cdf(a, v) - _cdf(b, v)) for v in {v for v, _ in a + b})
+
+
+def total_variation(a: Dict[str, int], n_a: int, b: Dict[str, int], n_b: int) -> Optional[float]:
+    """
+    Total variation distance between two value-count tables over n_a and
+    n_b values. Values missing from a partial table (top values, sketches)
+    share one "other" bucket, which makes the result a lower bound.
+    """
+    if not n_a or not n_b:
+        return None
+    distance = sum(abs(a.get(v, 0) / n_a - b.get(v, 0) / n_b) for v in a.keys() | b.keys())
+    other_a = max(0.0, 1 - sum(a.values()) / n_a)
+    other_b = max(0.0, 1 - sum(b.values()) / n_b)
+    return min(1.0, (distance + abs(other_a - other_b)) / 2)
+
+
+def _is_key_like(col: Dict[str, Any]) -> bool:
+    return col["count"] > 0 and col["unique"] > KEY_LIKE_RATIO * col["count"]
+
+
+def column_drift(
+    old: Dict[str, Any],
+    new: Dict[str, Any],
+    old_state: Any = None,
+    new_state: Any = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Distribution drift of one column as {"metric", "value", "source"}, or None
+    when the two sides are not comparable. Numeric columns use the KS
+    statistic, from the KLL sketches when both sides carry accumulator state,
+    else from percentiles; other kinds use the total variation distance of
+    their value counts.
+    """
+    if old["type"] in NUMERIC and new["type"] in NUMERIC:
+        old_values = getattr(old_state, "values", None)
+        new_values = getattr(new_state, "values", None)
+        if old_values is not None and new_values is not None:
+            value = old_values.sketch.ks_distance(new_values.sketch)
+            source = "state"
+        else:
+            value = quantile_ks(old, new)
+            source = "quantiles"
+        return {"metric": "ks", "value": value, "source": source} if value is not None else None
+
+    if old["type"] != new["type"]:
+        return None
+    if old["type"] == BOOLEAN:
+        if old.get("true_ratio") is None or new.get("true_ratio") is None:
+            return None
+        return {"metric": "tvd", "value": abs(new["true_ratio"] - old["true_ratio"]), "source": "profile"}
+    if _is_key_like(old) or _is_key_like(new):
+        return None
+    if old_state is not None and new_state is not None:
+        a, b = old_state.freq.value_counts(), new_state.freq.value_counts()
+        source = "state"
+    elif "top" in old and "top" in new:
+        a = {item["value"]: item["count"] for item in old["top"]}
+        b = {item["value"]: item["count"] for item in new["top"]}
+        source = "top"
+    else:
+        return None
+    value = total_variation(a, old["count"], b, new["count"])
+    return {"metric": "tvd", "value": value, "source": source} if value is not None else None
+
+
+def diff_profiles(
+    old: Dict[str, Any],
+    new: Dict[str, Any],
+    missing_threshold: float = DEFAULT_MISSING_THRESHOLD,
+    drift_threshold: float = DEFAULT_DRIFT_THRESHOLD,
+) -> Dict[str, Any]:
+    """
+    Compare two loaded profiles (see snapshot.load_profile). "columns" has
+    the measurements for every column present on both sides; "changes"
+    lists what crossed a threshold: added/removed columns, reordering,
+    type changes, missing-rate shifts of at least missing_threshold
+    percentage points and drift of at least drift_threshold.
+    """
+    old_profile, new_profile = old["profile"], new["profile"]
+    old_cols = dict(zip(_column_keys(old_profile), enumerate(old_profile["column_profiles"])))
+    new_cols = dict(zip(_column_keys(new_profile), enumerate(new_profile["column_profiles"])))
+    old_states = old["table"].columns if old["table"] is not None else None
+    new_states = new["table"].columns if new["table"] is not None else None
+
+    changes: List[Dict[str, Any]] = []
+    for key, (_, col) in old_cols.items():
+        if key not in new_cols:
+            changes.append({"column": col["name"], "change": "removed", "type": col["type"]})
+    for key, (_, col) in new_cols.items():
+        if key not in old_cols:
+            changes.append({"column": col["name"], "change": "added", "type": col["type"]})
+
+    common = [key for key in old_cols if key in new_cols]
+    new_order = sorted(common, key=lambda key: new_cols[key][0])
+    if common != new_order:
+        changes.append({
+            "column": None,
+            "change": "order",
+            "old": [name for name, _ in common],
+            "new": [name for name, _ in new_order],
+        })
+
+    columns = []
+    for key in common:
+        i, a = old_cols[key]
+        j, b = new_cols[key]
+        drift = column_drift(
+            a, b,
+            old_states[i] if old_states is not None else None,
+            new_states[j] if new_states is not None else None,
+        )
+        delta = b["missing_pct"] - a["missing_pct"]
+        columns.append({
+            "name": a["name"],
+            "old_type": a["type"],
+            "new_type": b["type"],
+            "old_missing_pct": a["missing_pct"],
+            "new_missing_pct": b["missing_pct"],
+            "drift": drift,
+        })
+        if a["type"] != b["type"]:
+            changes.append({"column": a["name"], "change": "type", "old": a["type"], "new": b["type"]})
+        if abs(delta) >= missing_threshold:
+            changes.append({
+                "column": a["name"],
+                "change": "missing",
+                "old": a["missing_pct"],
+                "new": b["missing_pct"],
+                "delta": delta,
+            })
+        if drift is not None and drift["value"] >= drift_threshold:
+            changes.append({"column": a["name"], "change": "drift", **drift})
+
+    return {
+        "old": {"rows": old_profile["rows"], "columns": old_profile["columns"]},
+        "new": {"rows": new_profile["rows"], "columns": new_profile["columns"]},
+        "thresholds": {"missing_pct": missing_threshold, "drift": drift_threshold},
+        "changes": changes,
+        "columns": columns,
+    }
+
+
+def format_diff(diff: Dict[str, Any]) -> str:
+    """Plain-text summary of diff_profiles() for the terminal."""
+    old, new = diff["old"], diff["new"]
+    lines = [f"rows {old['rows']} -> {new['rows']}, columns {old['columns']} -> {new['columns']}"]
+    for c in diff["changes"]:
+        change = c["change"]
+        if change in ("added", "removed"):
+            lines.append(f"{change:<8} {c['column']} ({c['type']})")
+        elif change == "order":
+            lines.append(f"{change:<8} {', '.join(c['new'])}")
+        elif change == "type":
+            lines.append(f"{change:<8} {c['column']}: {c['old']} -> {c['new']}")
+        elif change == "missing":
+            lines.append(f"{change:<8} {c['column']}: {c['old']:.2f}% -> {c['new']:.2f}% ({c['delta']:+.2f} pts)")
+        else:
+            lines.append(f"{change:<8} {c['column']}: {c['metric']} {c['value']:.3f} (from {c['source']})")
+    if not diff["changes"]:
+        lines.append("no changes above thresholds")
+    return "\n".join(lines)
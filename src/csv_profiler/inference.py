@@ -0,0 +1,95 @@
+"""
+Single-pass type inference
+"""
+
+import math
+from datetime import date, datetime, time, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .io import try_float
+
+BOOLEAN = "boolean"
+INTEGER = "integer"
+NUMBER = "number"
+DATE = "date"
+DATETIME = "datetime"
+TEXT = "text"
+
+# Most specific first; a column only ever moves to the right.
+KINDS = (BOOLEAN, INTEGER, NUMBER, DATE, DATETIME, TEXT)
+
+BOOL_VALUES = {"true": True, "false": False, "yes": True, "no": False}
+
+# The only widenings that keep earlier values valid; everything else is text.
+WIDER = {(INTEGER, NUMBER): NUMBER, (DATE, DATETIME): DATETIME}
+
+
+def parse_bool(value: str) -> Optional[bool]:
+    """Parse true/false/yes/no (any case)."""
+    return BOOL_VALUES.get(value.strip().casefold())
+
+
+def parse_int(value: str) -> Optional[int]:
+    """Parse an integer without going through float."""
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def parse_date(value: str) -> Optional[date]:
+    """Parse an ISO 8601 calendar date."""
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+def parse_datetime(value: str) -> Optional[datetime]:
+    """Parse an ISO 8601 date/time; aware values are normalized to naive UTC."""
+    try:
+        dt = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+PARSERS: Dict[str, Callable[[str], Any]] = {
+    BOOLEAN: parse_bool,
+    INTEGER: parse_int,
+    NUMBER: try_float,
+    DATE: parse_date,
+    DATETIME: parse_datetime,
+}
+
+
+def classify(value: str) -> Tuple[str, Any]:
+    """Return the most specific kind of a non-missing value and its parsed form."""
+    for kind in KINDS[:-1]:
+        parsed = PARSERS[kind](value)
+        if parsed is not None:
+            return kind, parsed
+    return TEXT, None
+
+
+def join(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    """Narrowest kind that holds values of both kinds (None means no values yet)."""
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    return WIDER.get((a, b)) or WIDER.get((b, a)) or TEXT
+
+
+def convert(kind: str, parsed: Any) -> Any:
+    """Convert a parsed value of a narrower kind to `kind`."""
+    if kind == NUMBER:
+        try:
+            return float(parsed)
+        except OverflowError:
+            return math.inf if parsed > 0 else -math.inf
+    if kind == DATETIME and not isinstance(parsed, datetime):
+        return datetime.combine(parsed, time())
+    return parsed
@@ -0,0 +1,137 @@
+"""
+Timers and counters for --stats
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """
+    Peak resident memory of this process so far, in MiB. With children,
+    the peak of the largest finished child process instead (e.g. --jobs
+    workers, once their pool has shut down); None when there was none.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    if children and not rss:
+        return None
+    # KiB on Linux, bytes on macOS
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / (1 << 10)
+
+
+def deep_size(obj: Any) -> int:
+    """
+    Bytes held by obj and everything it references through containers
+    and __slots__, counting shared objects once.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif not isinstance(o, (str, bytes, bytearray, int, float)):
+            for cls in type(o).__mro__:
+                slots = getattr(cls, "__slots__", ())
+                for name in (slots,) if isinstance(slots, str) else slots:
+                    if hasattr(o, name):
+                        stack.append(getattr(o, name))
+    return total
+
+
+class Stats:
+    """
+    Per-stage and per-column timings for one profiling run.
+    Stages accumulate if entered more than once; peak memory is the
+    high-water mark of this process, and separately of its largest
+    worker process, when the stage last finished. Per-column memory is
+    what each column's accumulator holds at the end; accumulators only
+    grow, so that is also their peak.
+    """
+
+    __slots__ = ("stages", "columns", "children_before")
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.columns: List[Dict[str, Any]] = []
+        # child processes that finished before the run (e.g. at import) are not workers
+        self.children_before = peak_rss_mb(children=True)
+
+    def add(self, name: str, seconds: float, rows: int = 0, n_bytes: int = 0) -> None:
+        stage = self.stages.setdefault(
+            name,
+            {"seconds": 0.0, "rows": 0, "bytes": 0, "peak_rss_mb": None, "worker_peak_rss_mb": None},
+        )
+        stage["seconds"] += seconds
+        stage["rows"] += rows
+        stage["bytes"] += n_bytes
+        stage["peak_rss_mb"] = peak_rss_mb()
+        workers = peak_rss_mb(children=True)
+        if workers != self.children_before:
+            stage["worker_peak_rss_mb"] = workers
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0, n_bytes: int = 0) -> Iterator[Dict[str, Any]]:
+        """Time a block; the yielded dict can set rows/bytes once they are known."""
+        counts = {"rows": rows, "bytes": n_bytes}
+        t0 = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            self.add(name, time.perf_counter() - t0, counts["rows"], counts["bytes"])
+
+    def set_columns(self, names: List[str], seconds: List[float], cells: List[int]) -> None:
+        self.columns = [
+            {"name": n, "seconds": s, "cells": c}
+            for n, s, c in zip(names, seconds, cells)
+        ]
+
+    def set_column_memory(self, columns: List[Any]) -> None:
+        """Record the state size of each column accumulator (adding the columns if untimed)."""
+        if not self.columns:
+            self.columns = [{"name": c.name, "seconds": None, "cells": c.total} for c in columns]
+        for entry, col in zip(self.columns, columns):
+            entry["state_mb"] = deep_size(col) / (1 << 20)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"stages": self.stages, "columns": self.columns}
+
+    def format_table(self) -> str:
+        """Plain-text breakdown for the terminal."""
+        def mb(value: Optional[float]) -> str:
+            return f"{value:9.1f}" if value is not None else f"{'-':>9}"
+
+        lines = [f"{'stage':<20} {'ms':>10} {'rows':>10} {'MB':>9} {'peak MB':>9} {'worker MB':>9}"]
+        for name, s in self.stages.items():
+            lines.append(
+                f"{name:<20} {s['seconds'] * 1000:10.2f} {s['rows']:10d} {s['bytes'] / (1 << 20):9.2f} "
+                f"{mb(s['peak_rss_mb'])} {mb(s['worker_peak_rss_mb'])}"
+            )
+        if self.columns:
+            timed = self.columns[0]["seconds"] is not None
+            total = (sum(c["seconds"] for c in self.columns) or 1.0) if timed else 1.0
+            lines.append("")
+            lines.append(f"{'column':<20} {'ms':>10} {'cells':>10} {'share':>9} {'state MB':>9}")
+            key = (lambda c: c["seconds"]) if timed else (lambda c: c.get("state_mb") or 0.0)
+            for c in sorted(self.columns, key=key, reverse=True):
+                ms = f"{c['seconds'] * 1000:10.2f}" if timed else f"{'-':>10}"
+                share = f"{c['seconds'] / total:9.1%}" if timed else f"{'-':>9}"
+                lines.append(f"{c['name'][:20]:<20} {ms} {c['cells']:10d} {share} {mb(c.get('state_mb'))}")
+        return "\n".join(lines)
@@ -0,0 +1,93 @@
+"""
+Parallel chunked profiling across processes
+"""
+
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .accumulators import FrequencyAccumulator, TableAccumulator
+from .io import find_record_boundaries, is_seekable, iter_csv_records, leading_blank_lines
+from .streaming import accumulate_file, accumulate_range
+
+# Below this many bytes per chunk the pool start-up costs more than it saves.
+MIN_CHUNK_BYTES = 1 << 20
+CHUNKS_PER_JOB = 4
+
+
+def read_header(file_path: str) -> Tuple[Optional[List[str]], int]:
+    """
+    Return the header record and the byte offset where data starts,
+    i.e. the end of the first non-blank record.
+    """
+    records = iter_csv_records(file_path)
+    header = next(records, None)
+    records.close()
+    if header is None:
+        return None, 0
+    _, blank_bytes = leading_blank_lines(file_path)
+    return header, find_record_boundaries(file_path, [blank_bytes])[0]
+
+
+def split_chunks(file_path: str, n_chunks: int, data_start: int = 0) -> List[Tuple[int, int]]:
+    """Split [data_start, EOF) into up to n_chunks record-aligned byte ranges."""
+    size = os.path.getsize(file_path)
+    span = size - data_start
+    if span <= 0:
+        return []
+    if n_chunks <= 1:
+        return [(data_start, size)]
+
+    targets = [data_start + span * i // n_chunks for i in range(1, n_chunks)]
+    cuts = [data_start] + find_record_boundaries(file_path, targets) + [size]
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def accumulate_file_parallel(
+    file_path: str,
+    jobs: int,
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+) -> Optional[TableAccumulator]:
+    """
+    Accumulate a CSV file with up to `jobs` worker processes.
+    Chunk results are merged in file order, so the report matches
+    a single-process run except for the sketched quantiles/histogram,
+    which stay within the sketch's rank error. make_freq must be picklable.
+    Chunk cuts come from one serial quote-counting pass (see
+    find_record_boundaries) before the workers start.
+    """
+    if not is_seekable(file_path):
+        # compressed files and stdin cannot be split by byte offset
+        return accumulate_file(file_path, make_freq)
+
+    header, data_start = read_header(file_path)
+    if header is None:
+        return None
+
+    span = os.path.getsize(file_path) - data_start
+    n_chunks = min(jobs * CHUNKS_PER_JOB, span // MIN_CHUNK_BYTES)
+    chunks = split_chunks(file_path, n_chunks, data_start)
+
+    if jobs <= 1 or len(chunks) <= 1:
+        return accumulate_range(file_path, header, data_start, data_start + span, make_freq)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+        futures = [pool.submit(accumulate_range, file_path, header, a, b, make_freq) for a, b in chunks]
+        table = futures[0].result()
+        for fut in futures[1:]:
+            table.merge(fut.result())
+
+    return table
+
+
+def profile_file_parallel(
+    file_path: str,
+    jobs: int,
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+) -> Dict[str, Any]:
+    """Profile a CSV file with up to `jobs` worker processes."""
+    table = accumulate_file_parallel(file_path, jobs, make_freq)
+    if table is None:
+        return {"rows": 0, "columns": 0, "column_profiles": []}
+    return table.to_profile()
@@ -2,8 +2,11 @@
 Profiling functions
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from .accumulators import ColumnAccumulator, FrequencyAccumulator, NumericAccumulator
+from .inference import PARSERS, TEXT, classify, join
 from .io import is_missing, try_float
+from .streaming import profile_records
 
 
 def check_empty(value) -> str:
@@ -54,91 +57,92 @@ def basic_profile(rows: List[Dict[str, str]]) -> Dict[str, Any]:
 
 
 def infer_type(values: List[str]) -> str:
-    """Infer column type (number/text)."""
-    usable = [v for v in values if not is_missing(v)]
-    if not usable:
-        return "text"
-
-    for v in usable:
-        if try_float(v) is None:
-            return "text"
-    return "number"
+    """Infer column type (boolean/integer/number/date/datetime/text)."""
+    kind = None
+    for v in values:
+        if is_missing(v) or (kind is not None and PARSERS[kind](v) is not None):
+            continue
+        kind = join(kind, classify(v)[0])
+        if kind == TEXT:
+            break
+    return kind or TEXT
 
 
 def numeric_stats(values: List[str]) -> Dict[str, Any]:
     """Compute statistics for numeric columns."""
     total = len(values)
-    usable = [v for v in values if not is_missing(v)]
-    missing = total - len(usable)
-
-    nums = []
-    for v in usable:
+    missing = 0
+    nums = NumericAccumulator()
+    freq = FrequencyAccumulator()
+    present: List[str] = []
+    parsed: List[float] = []
+
+    for v in values:
+        if is_missing(v):
+            missing += 1
+            continue
         n = try_float(v)
         if n is not None:
-            nums.append(n)
-
-    count = len(nums)
-    unique = len(set(nums))
+            present.append(v)
+            parsed.append(n)
+    nums.add_batch(parsed)
+    freq.add_many(present, parsed)
 
-    result: Dict[str, Any] = {
+    return {
         "total": total,
-        "count": count,
+        "count": nums.count,
         "missing": missing,
         "missing_pct": (100.0 * missing / total) if total else 0.0,
-        "unique": unique,
+        "unique": freq.unique_parsed(),
+        **nums.stats(),
     }
 
-    if nums:
-        result["min"] = min(nums)
-        result["max"] = max(nums)
-        result["mean"] = sum(nums) / count if count else None
-    else:
-        result["min"] = None
-        result["max"] = None
-        result["mean"] = None
-
-    return result
-
 
 def text_stats(values: List[str], top_k: int = 3) -> Dict[str, Any]:
     """Compute statistics for text columns."""
     total = len(values)
-    usable = [v for v in values if not is_missing(v)]
-    missing = total - len(usable)
-
-    counts: Dict[str, int] = {}
-    for v in usable:
-        counts[v] = counts.get(v, 0) + 1
+    freq = FrequencyAccumulator()
 
-    sorted_items = sorted(counts.items(), key=lambda x: x[1], reverse=True)
-    top = [{"value": v, "count": c} for v, c in sorted_items[:top_k]]
+    present = [v for v in values if not is_missing(v)]
+    missing = total - len(present)
+    freq.add_many(present)
 
     return {
         "total": total,
-        "count": len(usable),
+        "count": total - missing,
         "missing": missing,
         "missing_pct": (100.0 * missing / total) if total else 0.0,
-        "unique": len(counts),
-        "top": top,
+        "unique": freq.unique(),
+        "top": freq.top(top_k),
     }
 
 
-def get_column_values(rows: List[Dict[str, str]], column: str) -> List[str]:
-    """Extract all values for a column."""
-    return [row.get(column, "") for row in rows]
+def get_column_values(rows: List[Dict[str, str]], column: str) -> List[Optional[str]]:
+    """Extract all values for a column; None where a row has no such field (a short record)."""
+    return [row.get(column) for row in rows]
 
 
-def profile_column(name: str, values: List[str]) -> Dict[str, Any]:
-    """Profile a single column."""
-    col_type = infer_type(values)
+def dict_record(row: Dict[Optional[str], Any], columns: List[str]) -> List[Optional[str]]:
+    """
+    Positional record for a csv.DictReader row, as it was in the file:
+    DictReader pads short records with None and keeps the extra fields
+    of long ones in a list under the None key.
+    """
+    record = list(map(row.get, columns))
+    extra = row.get(None)
+    if extra:
+        record.extend(extra)
+    else:
+        while record and record[-1] is None:
+            record.pop()
+    return record
 
-    stats = numeric_stats(values) if col_type == "number" else text_stats(values)
 
-    return {
-        "name": name,
-        "type": col_type,
-        **stats,
-    }
+def profile_column(name: str, values: List[str]) -> Dict[str, Any]:
+    """Profile a single column."""
+    acc = ColumnAccumulator(name)
+    acc.update_many(list(values))
+    return acc.to_profile()
 
 
 def profile_rows(rows: List[Dict[str, str]]) -> Dict[str, Any]:
@@ -152,15 +156,5 @@ def profile_rows(rows: List[Dict[str, str]]) -> Dict[str, Any]:
     if not rows:
         return {"rows": 0, "columns": 0, "column_profiles": []}
 
-    columns = list(rows[0].keys())
-    column_profiles = []
-
-    for col in columns:
-        values = get_column_values(rows, col)
-        column_profiles.append(profile_column(col, values))
-
-    return {
-        "rows": len(rows),
-        "columns": len(columns),
-        "column_profiles": column_profiles,
-    }
+    columns = [col for col in rows[0] if col is not None]
+    return profile_records(columns, (dict_record(row, columns) for row in rows))
@@ -25,6 +25,18 @@ def build_markdown_report(profile: Dict[str, Any]) -> str:
     lines.append("")
     lines.append(f"- **Rows:** {profile.get('rows', 0)}")
     lines.append(f"- **Columns:** {profile.get('columns', 0)}")
+    ragged = profile.get('ragged_rows') or {}
+    if ragged.get('short') or ragged.get('long'):
+        lines.append(f"- **Ragged rows:** {ragged['short']} shorter than the header (absent cells counted as missing), "
+                     f"{ragged['long']} longer (extra fields ignored)")
+    sample = profile.get('sample')
+    if sample:
+        if sample.get('rows_total') is not None:
+            total = sample['rows_total']
+        else:
+            total = f"~{sample.get('rows_estimated')}"
+        lines.append(f"- **Sampled:** {sample['rows_sampled']} of {total} rows ({sample['mode']}); "
+                     f"statistics are estimates with {sample['confidence']:.0%} confidence intervals")
     lines.append("")
     
     # Column table
@@ -33,7 +45,7 @@ def build_markdown_report(profile: Dict[str, Any]) -> str:
     lines.append("| Column | Type | Missing | Unique |")
     lines.append("|--------|------|--------:|-------:|")
     
-    for col_info in profile['columns']:
+    for col_info in profile['column_profiles']:
         name = col_info['name']
         col_type = col_info['type']
         missing = col_info['missing']
@@ -46,20 +58,51 @@ def build_markdown_report(profile: Dict[str, Any]) -> str:
     lines.append("## Detailed Statistics")
     lines.append("")
     
-    for col_info in profile['columns']:
+    for col_info in profile['column_profiles']:
         lines.append(f"### {col_info['name']}")
         lines.append("")
         lines.append(f"- **Type:** {col_info['type']}")
         lines.append(f"- **Missing values:** {col_info['missing']}")
         lines.append(f"- **Unique values:** {col_info['unique']}")
+        ci = col_info.get('ci') or {}
+        if ci.get('missing_pct'):
+            lo, hi = ci['missing_pct']
+            lines.append(f"- **Missing % (CI):** {lo:.2f} to {hi:.2f}")
+        if ci.get('mean'):
+            lo, hi = ci['mean']
+            lines.append(f"- **Mean (CI):** {lo:.2f} to {hi:.2f}")
         
-        if col_info['type'] == 'number':
+        if col_info['type'] in ('number', 'integer'):
             if col_info.get('min') is not None:
                 lines.append(f"- **Min:** {col_info['min']}")
             if col_info.get('max') is not None:
                 lines.append(f"- **Max:** {col_info['max']}")
             if col_info.get('mean') is not None:
                 lines.append(f"- **Mean:** {col_info['mean']:.2f}")
+            if col_info.get('stddev') is not None:
+                lines.append(f"- **Std dev:** {col_info['stddev']:.2f}")
+            quantiles = col_info.get('quantiles') or {}
+            if quantiles.get('p50') is not None:
+                lines.append("- **Percentiles:** " + ", ".join(f"{k}={v}" for k, v in quantiles.items()))
+            histogram = col_info.get('histogram')
+            if histogram:
+                lines.append("- **Histogram:**")
+                edges = histogram['edges']
+                for lo, hi, count in zip(edges, edges[1:], histogram['counts']):
+                    lines.append(f"  - {lo:.4g} to {hi:.4g}: {count}")
+        elif col_info['type'] in ('date', 'datetime'):
+            if col_info.get('min') is not None:
+                lines.append(f"- **Min:** {col_info['min']}")
+                lines.append(f"- **Max:** {col_info['max']}")
+            if col_info.get('span_days') is not None:
+                lines.append(f"- **Span:** {col_info['span_days']} days")
+            if col_info.get('span_seconds') is not None:
+                lines.append(f"- **Span:** {col_info['span_seconds']:.0f} seconds")
+        elif col_info['type'] == 'boolean':
+            lines.append(f"- **True:** {col_info['true_count']}")
+            lines.append(f"- **False:** {col_info['false_count']}")
+            if col_info.get('true_ratio') is not None:
+                lines.append(f"- **True ratio:** {col_info['true_ratio']:.2%}")
         else:
             lines.append(f"- **Top values:**")
             for item in col_info.get('top', []):
@@ -0,0 +1,309 @@
+"""
+Row sampling and confidence intervals
+"""
+
+import csv
+import math
+import os
+import random
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .accumulators import FrequencyAccumulator, TableAccumulator
+from .inference import PARSERS, TEXT, classify, join
+from .io import is_missing, is_seekable, iter_csv_records
+from .parallel import read_header
+from .streaming import accumulate_records
+
+SAMPLE_MODES = ("reservoir", "seek")
+# Two-sided 95% normal quantile.
+Z_95 = 1.959963984540054
+# Bytes read after the header to estimate the record size for --sample-fraction in seek mode.
+PILOT_BYTES = 1 << 16
+# Resync attempts per random offset before giving up on it.
+SEEK_RETRIES = 8
+# A resync that opens a quote never closed gives up after this many bytes.
+MAX_RECORD_BYTES = 1 << 20
+
+
+class KindValidator:
+    """
+    Cheap full-scan type check: tracks only each column's kind,
+    with no value statistics, so a sample cannot hide a malformed value.
+    """
+
+    __slots__ = ("kinds", "open")
+
+    def __init__(self, n_columns: int) -> None:
+        self.kinds: List[Optional[str]] = [None] * n_columns
+        self.open = n_columns
+
+    def update(self, record: Sequence[str]) -> None:
+        if not self.open:
+            return
+        kinds = self.kinds
+        for i, value in enumerate(record[:len(kinds)]):
+            kind = kinds[i]
+            if kind == TEXT or is_missing(value):
+                continue
+            if kind is not None and PARSERS[kind](value) is not None:
+                continue
+            kinds[i] = join(kind, classify(value)[0])
+            if kinds[i] == TEXT:
+                self.open -= 1
+
+    def apply(self, table: TableAccumulator) -> None:
+        """Widen sampled columns to the kinds seen in the full scan."""
+        for col, kind in zip(table.columns, self.kinds):
+            col.widen(kind)
+
+
+def _validated(records: Iterable[Sequence[str]], validator: Optional[KindValidator]) -> Iterator[Sequence[str]]:
+    for record in records:
+        if validator is not None:
+            validator.update(record)
+        yield record
+
+
+def reservoir_sample(
+    records: Iterable[Sequence[str]],
+    size: int,
+    rng: random.Random,
+) -> Tuple[List[Sequence[str]], int]:
+    """
+    Uniform sample of `size` records in one pass (Algorithm R).
+    Returns the sample in file order and the number of records seen.
+    """
+    reservoir: List[Tuple[int, Sequence[str]]] = []
+    seen = 0
+    for seen, record in enumerate(records, 1):
+        if seen <= size:
+            reservoir.append((seen, record))
+        else:
+            j = rng.randrange(seen)
+            if j < size:
+                reservoir[j] = (seen, record)
+    reservoir.sort(key=lambda item: item[0])
+    return [r for _, r in reservoir], seen
+
+
+def bernoulli_sample(
+    records: Iterable[Sequence[str]],
+    fraction: float,
+    rng: random.Random,
+    counts: Dict[str, int],
+) -> Iterator[Sequence[str]]:
+    """
+    Yield each record with probability `fraction`, so the sample is never
+    held in memory. counts["seen"] is the number of records read so far.
+    """
+    counts["seen"] = 0
+    rand = rng.random
+    for seen, record in enumerate(records, 1):
+        counts["seen"] = seen
+        if rand() < fraction:
+            yield record
+
+
+def _read_record(f, n_columns: int) -> Optional[Tuple[List[str], int]]:
+    """Read the next physical record from a binary file; None at EOF."""
+    data = b""
+    while len(data) < MAX_RECORD_BYTES:
+        line = f.readline()
+        if not line:
+            break
+        data += line
+        if data.count(b'"') % 2 == 0:
+            break
+    if not data:
+        return None
+    try:
+        rows = [r for r in csv.reader(data.decode("utf-8").splitlines(keepends=True)) if r]
+    except (UnicodeDecodeError, csv.Error):
+        rows = []
+    if len(rows) != 1 or len(rows[0]) != n_columns:
+        return [], len(data)
+    return rows[0], len(data)
+
+
+def estimate_rows(file_path: str, data_start: int, n_columns: int) -> int:
+    """Estimate the record count from the mean record size of the first PILOT_BYTES."""
+    size = os.path.getsize(file_path)
+    sizes = []
+    with open(file_path, "rb") as f:
+        f.seek(data_start)
+        while f.tell() - data_start < PILOT_BYTES:
+            got = _read_record(f, n_columns)
+            if got is None:
+                break
+            sizes.append(got[1])
+    if not sizes:
+        return 0
+    return round((size - data_start) * len(sizes) / sum(sizes))
+
+
+def seek_sample(
+    file_path: str,
+    n_columns: int,
+    data_start: int,
+    size: int,
+    rng: random.Random,
+) -> Tuple[List[Sequence[str]], int]:
+    """
+    Sample `size` records by seeking to random byte offsets and
+    resyncing to the next line start, so most of the file is never read.
+    The record after an offset is picked with probability proportional
+    to the length of the record before it, which is unbiased as long as
+    neighbouring record lengths are unrelated. A resync that lands inside
+    a quoted field is detected by a field count mismatch and skipped.
+    Returns the sample (with replacement, in file order) and the
+    estimated record count of the file.
+    """
+    end = os.path.getsize(file_path)
+    if end <= data_start or size <= 0:
+        return [], 0
+
+    offsets = sorted(rng.randrange(data_start, end) for _ in range(size))
+    sample: List[Sequence[str]] = []
+    lengths: List[int] = []
+    with open(file_path, "rb") as f:
+        for offset in offsets:
+            f.seek(offset - 1 if offset > data_start else offset)
+            if offset > data_start:
+                f.readline()
+            start = f.tell()
+            for _ in range(SEEK_RETRIES):
+                got = _read_record(f, n_columns)
+                if got is None:
+                    # past the last record: wrap to the first one
+                    f.seek(data_start)
+                    start = data_start
+                    continue
+                record, length = got
+                if record:
+                    sample.append(record)
+                    lengths.append(length)
+                    break
+                # quote parity may be inverted here: retry from the next line start
+                f.seek(start)
+                f.readline()
+                start = f.tell()
+
+    estimated = round((end - data_start) * len(lengths) / sum(lengths)) if lengths else 0
+    return sample, estimated
+
+
+def wilson_interval(k: int, n: int, z: float = Z_95) -> Optional[List[float]]:
+    """Wilson score interval for a proportion k/n."""
+    if not n:
+        return None
+    p = k / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    lo = 0.0 if k == 0 else max(0.0, center - half)
+    hi = 1.0 if k == n else min(1.0, center + half)
+    return [lo, hi]
+
+
+def mean_interval(
+    mean: Optional[float],
+    stddev: Optional[float],
+    n: int,
+    population: Optional[int] = None,
+    z: float = Z_95,
+) -> Optional[List[float]]:
+    """
+    Normal-approximation interval for a sample mean; the finite
+    population correction applies when sampling without replacement
+    from `population` rows.
+    """
+    if mean is None or stddev is None or n < 2 or not math.isfinite(stddev):
+        return None
+    half = z * stddev / math.sqrt(n)
+    if population is not None and population > 1:
+        half *= math.sqrt(max(population - n, 0) / (population - 1))
+    return [mean - half, mean + half]
+
+
+def add_confidence(profile: Dict[str, Any], population: Optional[int]) -> None:
+    """Attach 95% intervals for missing_pct and mean to each sampled column."""
+    for col in profile["column_profiles"]:
+        ci: Dict[str, Any] = {}
+        missing = wilson_interval(col["missing"], col["total"])
+        if missing is not None:
+            ci["missing_pct"] = [100.0 * missing[0], 100.0 * missing[1]]
+        if "mean" in col:
+            ci["mean"] = mean_interval(col["mean"], col.get("stddev"), col["count"], population)
+        col["ci"] = ci
+
+
+def profile_sample(
+    file_path: str,
+    size: Optional[int] = None,
+    fraction: Optional[float] = None,
+    mode: str = "reservoir",
+    seed: Optional[int] = None,
+    validate: bool = False,
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+) -> Dict[str, Any]:
+    """
+    Profile a sample of a CSV file's records, given either a row budget
+    (`size`) or a `fraction`. The report gains a "sample" section and
+    per-column 95% confidence intervals. With validate, every record is
+    still type-checked, so a column can widen (e.g. number -> text)
+    because of a value the sample missed.
+    """
+    if mode not in SAMPLE_MODES:
+        raise ValueError(f"Unknown sample mode: {mode}")
+    if (size is None) == (fraction is None):
+        raise ValueError("Give exactly one of size or fraction")
+
+    if mode == "seek" and not is_seekable(file_path):
+        raise ValueError("Seek sampling needs an uncompressed file, not a stream")
+
+    rng = random.Random(seed)
+    records = iter_csv_records(file_path)
+    header = next(records, None)
+    if header is None:
+        return {"rows": 0, "columns": 0, "column_profiles": []}
+
+    validator = KindValidator(len(header)) if validate else None
+    counts: Dict[str, int] = {}
+    if mode == "reservoir":
+        records = _validated(records, validator)
+        if size is not None:
+            sample, population = reservoir_sample(records, size, rng)
+        else:
+            # accumulated as it is drawn; the population is known once it is consumed
+            sample = bernoulli_sample(records, fraction, rng, counts)
+            population = None
+    else:
+        records.close()
+        _, data_start = read_header(file_path)
+        if size is None:
+            size = math.ceil(fraction * estimate_rows(file_path, data_start, len(header)))
+        sample, population = seek_sample(file_path, len(header), data_start, size, rng)
+        if validator is not None:
+            for record in iter_csv_records(file_path, data_start):
+                validator.update(record)
+
+    table = accumulate_records(header, sample, make_freq)
+    if validator is not None:
+        validator.apply(table)
+    if population is None:
+        population = counts["seen"]
+    # Bernoulli draws are without replacement too, so the correction applies
+    fpc_population = population if mode == "reservoir" else None
+
+    profile = table.to_profile()
+    profile["sample"] = {
+        "mode": mode,
+        "rows_sampled": table.rows,
+        "rows_total": population if mode == "reservoir" else None,
+        "rows_estimated": population if mode == "seek" else None,
+        "confidence": 0.95,
+        "types_validated": validate,
+    }
+    if profile["column_profiles"]:
+        add_confidence(profile, fpc_population)
+    return profile
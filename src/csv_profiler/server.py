@@ -0,0 +1,653 @@
+"""
+Profiling service over HTTP (TCP or Unix socket)
+
+    POST /jobs                  {"path": ..., "engine": "python", "approx": false}
+                                or the CSV itself as the body (any other content type)
+    GET  /jobs/<id>             job status
+    GET  /jobs/<id>/events      status updates as newline-delimited JSON until the job ends
+    GET  /jobs/<id>/result      the profile (same JSON as profile_rows)
+    GET  /health                queue and worker counts
+
+POST /jobs?wait=1 answers with the result instead of the job status.
+Path jobs read files as the server user, so they are limited to the
+allowed roots, and without roots only served on loopback or a Unix socket.
+"""
+
+import asyncio
+import http.client
+import io
+import ipaddress
+import itertools
+import json
+import os
+import signal
+import socket
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .vectorized import ENGINES, missing_requirement
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_MAX_UPLOAD_MB = 1024
+# Finished jobs (and their results) kept for GET before the oldest are dropped.
+MAX_FINISHED_JOBS = 256
+READ_CHUNK = 1 << 16
+MAX_JSON_BYTES = 1 << 16
+LINGER_SECONDS = 2.0
+EMPTY_PROFILE: Dict[str, Any] = {"rows": 0, "columns": 0, "column_profiles": []}
+# Connections whose response head is written; errors after that cannot be answered.
+_STARTED: "weakref.WeakSet[asyncio.StreamWriter]" = weakref.WeakSet()
+
+
+class HTTPError(Exception):
+    """An error answered with `status` and a JSON {"error": message} body."""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+# ========== WORKERS ==========
+
+_progress = None
+
+
+def init_worker(progress, max_memory: Optional[int]) -> None:
+    """
+    Pool initializer: keep the progress queue, cap the address space and
+    import the profiler once, so every job after the first runs warm.
+    """
+    global _progress
+    _progress = progress
+    if max_memory and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+    import csv_profiler.sketches  # noqa: F401
+    import csv_profiler.streaming  # noqa: F401
+    import csv_profiler.vectorized  # noqa: F401
+
+
+def ping() -> int:
+    return os.getpid()
+
+
+def run_job(job_id: int, path: str, engine: str, approx: bool) -> Dict[str, Any]:
+    """Profile one file in a worker, reporting (job_id, rows, bytes read) as it goes."""
+    from csv_profiler.accumulators import FrequencyAccumulator
+    from csv_profiler.io import decompress_stream
+    from csv_profiler.sketches import SketchFrequency
+    from csv_profiler.streaming import accumulate_text
+    from csv_profiler.vectorized import accumulate_with_engine
+
+    make_freq = SketchFrequency if approx else FrequencyAccumulator
+    if engine != "python":
+        table = accumulate_with_engine(path, engine, 1, make_freq)
+    else:
+        with open(path, "rb") as raw:
+            f = io.TextIOWrapper(decompress_stream(raw), encoding="utf-8", newline="")
+
+            def on_progress(rows: int) -> None:
+                if _progress is not None:
+                    _progress.put((job_id, rows, raw.tell()))
+
+            table = accumulate_text(f, make_freq, on_progress)
+    return table.to_profile() if table is not None else EMPTY_PROFILE
+
+
+# ========== JOBS ==========
+
+class Job:
+    """One profiling request; `changed` is set (and replaced) on every update."""
+
+    __slots__ = ("id", "path", "engine", "approx", "upload", "size", "status", "rows", "bytes_read",
+                 "result", "error", "created", "started", "finished", "changed")
+
+    def __init__(self, job_id: int, path: str, engine: str, approx: bool, upload: bool) -> None:
+        self.id = job_id
+        self.path = path
+        self.engine = engine
+        self.approx = approx
+        self.upload = upload
+        self.size = os.path.getsize(path)
+        self.status = QUEUED
+        self.rows = 0
+        self.bytes_read = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "file": None if self.upload else self.path,
+            "engine": self.engine,
+            "approx": self.approx,
+            "rows": self.rows,
+            "bytes": self.size,
+            "bytes_read": self.bytes_read,
+            "progress": min(self.bytes_read / self.size, 1.0) if self.size else None,
+            "error": self.error,
+            "seconds": round((self.finished or time.time()) - self.started, 6) if self.started else None,
+        }
+
+
+class ProfileService:
+    """
+    Job queue in front of a pool of warm worker processes.
+    At most queue_size jobs wait for a worker; further submissions are
+    refused with 503 (and uploads are refused before their body is read),
+    so a burst cannot pile up unbounded work or temp files. max_memory
+    caps each worker's address space; a job that exceeds it fails
+    without taking the service down. Path jobs may only name files under
+    `roots`; without roots they are refused unless the service listens
+    on a loopback address or a Unix socket.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_memory_mb: Optional[int] = None,
+        max_upload_mb: int = DEFAULT_MAX_UPLOAD_MB,
+        spool_dir: Optional[str] = None,
+        roots: Optional[Sequence[str]] = None,
+    ) -> None:
+        import multiprocessing
+
+        self.workers = workers
+        self.max_memory = max_memory_mb << 20 if max_memory_mb else None
+        self.max_upload = max_upload_mb << 20
+        self.spool_dir = spool_dir
+        self.roots: Optional[List[str]] = [os.path.realpath(r) for r in roots] if roots else None
+        self.local = True
+        self.queue: "asyncio.Queue[Job]" = asyncio.Queue(maxsize=queue_size)
+        self.jobs: Dict[int, Job] = {}
+        self.ids = itertools.count(1)
+        self.running = 0
+        self.progress = multiprocessing.get_context().Queue()
+        self.pool = self._new_pool()
+        self.tasks = []
+        self.reader: Optional[threading.Thread] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.progress, self.max_memory))
+
+    async def _warm(self, pool: ProcessPoolExecutor) -> None:
+        """Start every worker of `pool` so the first jobs do not pay for it."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(pool, ping) for _ in range(self.workers)))
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_socket: Optional[str] = None) -> None:
+        """Warm the workers, start dispatching and listen on TCP or a Unix socket."""
+        loop = asyncio.get_running_loop()
+        await self._warm(self.pool)
+        self.reader = threading.Thread(target=self._read_progress, args=(loop,), daemon=True)
+        self.reader.start()
+        self.tasks = [asyncio.ensure_future(self._dispatch()) for _ in range(self.workers)]
+        self.local = bool(unix_socket) or is_loopback(host)
+        if unix_socket:
+            self.server = await asyncio.start_unix_server(self.handle, path=unix_socket)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.progress.put(None)
+        if self.reader is not None:
+            self.reader.join()
+        for job in self.jobs.values():
+            self._discard_upload(job)
+
+    def _read_progress(self, loop: asyncio.AbstractEventLoop) -> None:
+        # multiprocessing queues block, so they are drained on a thread
+        while True:
+            message = self.progress.get()
+            if message is None:
+                return
+            loop.call_soon_threadsafe(self._on_progress, *message)
+
+    def _on_progress(self, job_id: int, rows: int, bytes_read: int) -> None:
+        job = self.jobs.get(job_id)
+        if job is not None and job.status == RUNNING:
+            job.rows = rows
+            job.bytes_read = bytes_read
+            job.notify()
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job.status = RUNNING
+            job.started = time.time()
+            job.notify()
+            self.running += 1
+            pool = self.pool
+            try:
+                job.result = await loop.run_in_executor(pool, run_job, job.id, job.path, job.engine, job.approx)
+                job.status = DONE
+                job.rows = job.result["rows"]
+                job.bytes_read = job.size
+            except BrokenProcessPool:
+                job.status = FAILED
+                job.error = "worker process died (memory limit exceeded?)"
+                if self.pool is pool:
+                    self.pool = self._new_pool()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    try:
+                        await self._warm(self.pool)
+                    except BrokenProcessPool:
+                        pass  # the next job replaces it again
+            except MemoryError:
+                job.status = FAILED
+                job.error = "MemoryError: job exceeded the worker memory limit"
+            except Exception as exc:
+                job.status = FAILED
+                job.error = f"{type(exc).__name__}: {exc}"
+            finally:
+                self.running -= 1
+                job.finished = time.time()
+                self._discard_upload(job)
+                job.notify()
+                self._forget_old_jobs()
+
+    def _discard_upload(self, job: Job) -> None:
+        if job.upload:
+            try:
+                os.unlink(job.path)
+            except OSError:
+                pass
+
+    def _forget_old_jobs(self) -> None:
+        finished = [job for job in self.jobs.values() if job.done]
+        for job in sorted(finished, key=lambda j: j.finished)[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+
+    def submit(self, path: str, engine: str = "python", approx: bool = False, upload: bool = False) -> Job:
+        if self.queue.full():
+            raise HTTPError(503, "job queue is full", {"Retry-After": "1"})
+        job = Job(next(self.ids), path, engine, approx, upload)
+        self.jobs[job.id] = job
+        self.queue.put_nowait(job)
+        return job
+
+    # ---------- HTTP ----------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one request per connection."""
+        try:
+            try:
+                method, target, headers = await read_head(reader)
+                await self.route(method, target, headers, reader, writer)
+            except HTTPError as exc:
+                if writer not in _STARTED:
+                    await send_json(writer, exc.status, {"error": str(exc)}, exc.headers)
+                await linger(reader, writer)
+            except Exception as exc:
+                if writer not in _STARTED:
+                    await send_json(writer, 500, {"error": f"{type(exc).__name__}: {exc}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method: str, target: str, headers: Dict[str, str], reader, writer) -> None:
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["health"] and method == "GET":
+            await send_json(writer, 200, {
+                "workers": self.workers,
+                "running": self.running,
+                "queued": self.queue.qsize(),
+                "queue_size": self.queue.maxsize,
+                "jobs": len(self.jobs),
+            })
+            return
+
+        if parts == ["jobs"] and method == "POST":
+            job = await self.create_job(headers, reader, query)
+            if query.get("wait", ["0"])[0] not in ("0", "false", ""):
+                while not job.done:
+                    await job.changed.wait()
+                await self.send_result(writer, job)
+            else:
+                await send_json(writer, 202, job.to_dict(), {"Location": f"/jobs/{job.id}"})
+            return
+
+        if len(parts) in (2, 3) and parts[0] == "jobs" and method == "GET":
+            job = self.jobs.get(int(parts[1])) if parts[1].isdigit() else None
+            if job is None:
+                raise HTTPError(404, "no such job")
+            view = parts[2] if len(parts) == 3 else None
+            if view is None:
+                await send_json(writer, 200, job.to_dict())
+            elif view == "result":
+                await self.send_result(writer, job)
+            elif view == "events":
+                await self.send_events(writer, job)
+            else:
+                raise HTTPError(404, "not found")
+            return
+
+        raise HTTPError(404 if method in ("GET", "POST") else 405, "not found")
+
+    async def create_job(self, headers: Dict[str, str], reader, query: Dict[str, Any]) -> Job:
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+        if content_type == "application/json":
+            body = b"".join([chunk async for chunk in read_body(reader, headers, MAX_JSON_BYTES)])
+            try:
+                request = json.loads(body)
+            except ValueError:
+                raise HTTPError(400, "body is not valid JSON")
+            if not isinstance(request, dict) or not isinstance(request.get("path"), str):
+                raise HTTPError(400, 'expected {"path": ...}')
+            path = self.allowed_path(request["path"])
+            engine = request.get("engine", "python")
+            approx = bool(request.get("approx", False))
+            if not os.path.isfile(path):
+                raise HTTPError(404, f"File not found: {request['path']}")
+        else:
+            engine = query.get("engine", ["python"])[0]
+            approx = query.get("approx", ["0"])[0] not in ("0", "false", "")
+            path = None
+
+        if engine not in ENGINES:
+            raise HTTPError(400, f"engine must be one of: {', '.join(ENGINES)}")
+        if missing_requirement(engine):
+            raise HTTPError(400, missing_requirement(engine))
+        if approx and engine != "python":
+            raise HTTPError(400, "approx requires the python engine")
+        if path is not None:
+            return self.submit(path, engine, approx)
+
+        # refuse before reading a body that could not be queued anyway
+        if self.queue.full():
+            raise HTTPError(503, "job queue is full", {"Retry-After": "1"})
+        fd, tmp = tempfile.mkstemp(prefix="csv-profiler-", suffix=".upload", dir=self.spool_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in read_body(reader, headers, self.max_upload):
+                    f.write(chunk)
+            return self.submit(tmp, engine, approx, upload=True)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def allowed_path(self, path: str) -> str:
+        """The resolved path of a path job, or 403 when it is outside the roots."""
+        if self.roots is None and not self.local:
+            raise HTTPError(403, "path jobs need --root when serving on a non-loopback address")
+        # symlinks resolved first, so none can lead out of a root
+        real = os.path.realpath(path)
+        if self.roots is not None and not any(os.path.commonpath([root, real]) == root for root in self.roots):
+            raise HTTPError(403, f"{path} is outside the allowed roots")
+        return real
+
+    async def send_result(self, writer, job: Job) -> None:
+        if job.status == DONE:
+            await send_json(writer, 200, job.result)
+        elif job.status == FAILED:
+            await send_json(writer, 500, {"error": job.error, "job": job.to_dict()})
+        else:
+            await send_json(writer, 202, job.to_dict())
+
+    async def send_events(self, writer, job: Job) -> None:
+        start_response(writer, 200, {"Content-Type": "application/x-ndjson", "Transfer-Encoding": "chunked"})
+        while True:
+            changed = job.changed
+            line = json.dumps(job.to_dict()).encode() + b"\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            await writer.drain()
+            if job.done:
+                break
+            await changed.wait()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+# ========== HTTP/1.1 ==========
+
+async def read_head(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431, "request head too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method.upper(), target, headers
+
+
+async def read_body(reader: asyncio.StreamReader, headers: Dict[str, str], limit: int):
+    """Yield the request body in chunks, Content-Length or chunked; 413 past limit bytes."""
+    total = 0
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            line = await reader.readline()
+            try:
+                size = int(line.split(b";")[0], 16)
+            except ValueError:
+                raise HTTPError(400, "malformed chunk")
+            if size == 0:
+                # trailers, then the blank line
+                while (await reader.readline()) not in (b"\r\n", b""):
+                    pass
+                return
+            total += size
+            if total > limit:
+                raise HTTPError(413, "request body too large")
+            while size:
+                chunk = await reader.read(min(size, READ_CHUNK))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", size)
+                size -= len(chunk)
+                yield chunk
+            await reader.readexactly(2)
+        return
+
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise HTTPError(400, "malformed Content-Length")
+    if length < 0:
+        raise HTTPError(400, "malformed Content-Length")
+    if length > limit:
+        raise HTTPError(413, "request body too large")
+    while length:
+        chunk = await reader.read(min(length, READ_CHUNK))
+        if not chunk:
+            raise asyncio.IncompleteReadError(b"", length)
+        length -= len(chunk)
+        yield chunk
+
+
+async def linger(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Discard what the client is still sending (e.g. a refused upload) for a
+    moment before closing, so it reads the response instead of a reset.
+    """
+    if writer.can_write_eof():
+        writer.write_eof()
+
+    async def discard() -> None:
+        while await reader.read(READ_CHUNK):
+            pass
+
+    try:
+        await asyncio.wait_for(discard(), LINGER_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+
+
+def response_head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", "Connection: close"]
+    lines.extend(f"{k}: {v}" for k, v in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def start_response(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str]) -> None:
+    writer.write(response_head(status, headers))
+    _STARTED.add(writer)
+
+
+async def send_json(writer: asyncio.StreamWriter, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+    data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    start_response(writer, status, {
+        "Content-Type": "application/json",
+        "Content-Length": str(len(data)),
+        **(headers or {}),
+    })
+    writer.write(data)
+    await writer.drain()
+
+
+async def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    unix_socket: Optional[str] = None,
+    **options: Any,
+) -> None:
+    """Run a ProfileService until cancelled or sent SIGTERM."""
+    service = ProfileService(**options)
+    await service.start(host, port, unix_socket)
+    stop = asyncio.Event()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    except (NotImplementedError, RuntimeError):  # Windows, or not the main thread
+        pass
+    try:
+        await stop.wait()
+    finally:
+        await service.close()
+        if unix_socket:
+            try:
+                os.unlink(unix_socket)
+            except OSError:
+                pass
+
+
+# ========== CLIENT ==========
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class ServiceClient:
+    """Blocking client for a running service, e.g. for scripts and tests."""
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        unix_socket: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.timeout = timeout
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.unix_socket:
+            return _UnixConnection(self.unix_socket, self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, body: Any = None, headers: Optional[Dict[str, str]] = None):
+        """Send a request and return (status, decoded JSON body)."""
+        conn = self._connect()
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            resp = conn.getresponse()
+            return resp.status, json.loads(resp.read() or b"null")
+        finally:
+            conn.close()
+
+    def submit_path(self, path: str, engine: str = "python", approx: bool = False, wait: bool = False):
+        body = json.dumps({"path": os.path.abspath(path), "engine": engine, "approx": approx})
+        return self.request("POST", "/jobs" + ("?wait=1" if wait else ""), body, {"Content-Type": "application/json"})
+
+    def submit_stream(self, f, engine: str = "python", approx: bool = False, wait: bool = False):
+        """Upload an open binary file (sent chunked, so it is never read whole)."""
+        query = f"?engine={engine}&approx={int(approx)}" + ("&wait=1" if wait else "")
+        return self.request("POST", "/jobs" + query, f, {"Content-Type": "text/csv"})
+
+    def status(self, job_id: int):
+        return self.request("GET", f"/jobs/{job_id}")
+
+    def result(self, job_id: int):
+        return self.request("GET", f"/jobs/{job_id}/result")
+
+    def events(self, job_id: int) -> Iterator[Dict[str, Any]]:
+        """Job status updates until it finishes."""
+        conn = self._connect()
+        try:
+            conn.request("GET", f"/jobs/{job_id}/events")
+            resp = conn.getresponse()
+            if resp.status != 200:
+                raise RuntimeError(json.loads(resp.read())["error"])
+            for line in resp:
+                yield json.loads(line)
+        finally:
+            conn.close()
@@ -0,0 +1,160 @@
+"""
+Binary profile files (.cprof)
+"""
+
+import io
+import json
+import pickle
+import struct
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .accumulators import TableAccumulator
+
+SNAPSHOT_SUFFIX = ".cprof"
+MAGIC = b"CSVPROF\0"
+# Layout of the file itself.
+FORMAT_VERSION = 1
+# Bump when the profile block changes incompatibly; readers refuse newer ones.
+PROFILE_VERSION = 1
+# Bump whenever the pickled accumulator layout changes; readers skip other versions.
+STATE_VERSION = 1
+COMPRESS_LEVEL = 1
+_HEADER = struct.Struct("<8sBQ")
+_STATE_HEADER = struct.Struct("<B")
+
+# Everything a TableAccumulator pickle may reference (also used by cache.py).
+STATE_GLOBALS = {
+    ("csv_profiler.accumulators", "TableAccumulator"),
+    ("csv_profiler.accumulators", "ColumnAccumulator"),
+    ("csv_profiler.accumulators", "NumericAccumulator"),
+    ("csv_profiler.accumulators", "IntegerAccumulator"),
+    ("csv_profiler.accumulators", "TemporalAccumulator"),
+    ("csv_profiler.accumulators", "BooleanAccumulator"),
+    ("csv_profiler.accumulators", "FrequencyAccumulator"),
+    ("csv_profiler.sketches", "SketchFrequency"),
+    ("csv_profiler.sketches", "HyperLogLog"),
+    ("csv_profiler.sketches", "SpaceSaving"),
+    ("csv_profiler.sketches", "KLL"),
+    ("datetime", "date"),
+    ("datetime", "datetime"),
+    ("datetime", "timedelta"),
+    ("datetime", "timezone"),
+    ("builtins", "set"),
+    ("builtins", "frozenset"),
+    ("builtins", "bytearray"),
+}
+
+
+class StateUnpickler(pickle.Unpickler):
+    """Unpickler that only builds the classes in `allowed`, so a crafted file cannot run code."""
+
+    def __init__(self, data: bytes, allowed: set):
+        super().__init__(io.BytesIO(data))
+        self.allowed = allowed
+
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) not in self.allowed:
+            raise pickle.UnpicklingError(f"{module}.{name} is not allowed in accumulator state")
+        return super().find_class(module, name)
+
+
+def _pickle_block(obj: Any) -> bytes:
+    buf = io.BytesIO()
+    pickler = pickle.Pickler(buf, protocol=pickle.HIGHEST_PROTOCOL)
+    # Accumulator state is a tree with no shared objects, so the memo only
+    # costs time: with it, pickling value-count tables is about 5x slower.
+    pickler.fast = True
+    pickler.dump(obj)
+    return zlib.compress(buf.getbuffer(), COMPRESS_LEVEL)
+
+
+def write_snapshot(
+    profile: Dict[str, Any],
+    table: Optional[TableAccumulator],
+    path: str,
+    source: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Write a profile and the accumulator state it was computed from.
+    The file is MAGIC, a format version byte and the length of the profile
+    block, then two zlib-compressed blocks: the profile with its metadata
+    as JSON, and a state version byte followed by the pickled table
+    accumulator (None for sampled profiles). Readers that only need the
+    numbers never touch the state. In exact mode the state holds every
+    distinct raw value, so it grows with the data; --approx bounds it.
+    """
+    head = json.dumps({
+        "version": PROFILE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "source": source or {},
+        "profile": profile,
+    }, ensure_ascii=False).encode("utf-8")
+    head = zlib.compress(head, COMPRESS_LEVEL)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(head)))
+        f.write(head)
+        f.write(_STATE_HEADER.pack(STATE_VERSION))
+        f.write(_pickle_block(table))
+
+
+def is_snapshot(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _read_state(path: str, data: bytes) -> Optional[TableAccumulator]:
+    """The table accumulator of a state block, or None when its version is not STATE_VERSION."""
+    if len(data) < _STATE_HEADER.size:
+        return None
+    (version,) = _STATE_HEADER.unpack_from(data)
+    if version != STATE_VERSION:
+        return None
+    try:
+        table = StateUnpickler(zlib.decompress(data[_STATE_HEADER.size:]), STATE_GLOBALS).load()
+    except (zlib.error, pickle.UnpicklingError, EOFError, AttributeError, TypeError) as exc:
+        raise ValueError(f"{path} has a corrupt state block: {exc}") from None
+    if table is not None and not isinstance(table, TableAccumulator):
+        raise ValueError(f"{path} has a corrupt state block")
+    return table
+
+
+def read_snapshot(path: str, state: bool = True) -> Dict[str, Any]:
+    """
+    Load a .cprof file as {"created", "source", "profile", "table"}.
+    The table is None with state=False, for sampled profiles, and when the
+    file's accumulator state comes from another version; the profile
+    still loads. Unpickling the state only builds accumulator classes.
+    """
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a binary profile")
+        _, version, head_len = _HEADER.unpack(header)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has binary profile format {version}, expected {FORMAT_VERSION}")
+        try:
+            snapshot = json.loads(zlib.decompress(f.read(head_len)))
+        except (zlib.error, ValueError) as exc:
+            raise ValueError(f"{path} has a corrupt profile block: {exc}") from None
+        if not isinstance(snapshot, dict) or "column_profiles" not in snapshot.get("profile", {}):
+            raise ValueError(f"{path} has a corrupt profile block")
+        if snapshot.pop("version", PROFILE_VERSION) > PROFILE_VERSION:
+            raise ValueError(f"{path} has profile version newer than {PROFILE_VERSION}")
+        snapshot["table"] = _read_state(path, f.read()) if state else None
+    return snapshot
+
+
+def load_profile(path: str, state: bool = True) -> Dict[str, Any]:
+    """Read a .cprof snapshot or a JSON report into the read_snapshot() layout (JSON has no state)."""
+    if is_snapshot(path):
+        return read_snapshot(path, state)
+    try:
+        with open(path, encoding="utf-8") as f:
+            profile = json.load(f)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        profile = None
+    if not isinstance(profile, dict) or "column_profiles" not in profile:
+        raise ValueError(f"{path} is not a profile report")
+    return {"created": None, "source": {}, "profile": profile, "table": None}
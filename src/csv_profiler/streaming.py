@@ -0,0 +1,150 @@
+"""
+Single-pass streaming profiler
+"""
+
+import csv
+import os
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, TextIO
+
+from .accumulators import FrequencyAccumulator, TableAccumulator
+from .instrument import Stats
+from .io import is_stdin, iter_csv_records
+
+# Records per block fed to TableAccumulator.update_block, capped at
+# BLOCK_CELLS cells so blocks of wide tables stay a few MB.
+BLOCK_ROWS = 4096
+BLOCK_CELLS = 1 << 18
+# Rows between progress callbacks in accumulate_text.
+PROGRESS_BLOCK_ROWS = 16384
+
+
+def block_rows_for(header: Sequence[str], max_rows: int = BLOCK_ROWS) -> int:
+    """Rows per block for a table with this header."""
+    return max(1, min(max_rows, BLOCK_CELLS // max(1, len(header))))
+
+
+def accumulate_records(
+    header: Sequence[str],
+    records: Iterable[Sequence[str]],
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+) -> TableAccumulator:
+    """Fold positional records into a fresh table accumulator, a block at a time."""
+    table = TableAccumulator(header, make_freq)
+    records = iter(records)
+    block_rows = block_rows_for(header)
+    while True:
+        block = list(islice(records, block_rows))
+        if not block:
+            break
+        table.update_block(block)
+    return table
+
+
+def accumulate_file(
+    file_path: str,
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+) -> Optional[TableAccumulator]:
+    """Accumulate a whole CSV file; None when it has no header."""
+    records = iter_csv_records(file_path)
+    header = next(records, None)
+    if header is None:
+        return None
+    return accumulate_records(header, records, make_freq)
+
+
+def accumulate_range(
+    file_path: str,
+    header: Sequence[str],
+    start: int,
+    end: int,
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+) -> TableAccumulator:
+    """Accumulate the data records in one record-aligned byte range."""
+    return accumulate_records(header, iter_csv_records(file_path, start, end), make_freq)
+
+
+def accumulate_text(
+    f: TextIO,
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+    on_progress: Optional[Callable[[int], None]] = None,
+    block_rows: int = PROGRESS_BLOCK_ROWS,
+) -> Optional[TableAccumulator]:
+    """
+    Accumulate CSV records from an open text stream (newline='').
+    on_progress is called with the rows read so far after every block.
+    """
+    records = (r for r in csv.reader(f) if r)
+    header = next(records, None)
+    if header is None:
+        return None
+
+    table = TableAccumulator(header, make_freq)
+    block_rows = block_rows_for(header, block_rows)
+    while True:
+        block = list(islice(records, block_rows))
+        if not block:
+            break
+        table.update_block(block)
+        if on_progress is not None:
+            on_progress(table.rows)
+    return table
+
+
+def accumulate_file_timed(
+    file_path: str,
+    stats: Stats,
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+    block_rows: int = BLOCK_ROWS,
+) -> Optional[TableAccumulator]:
+    """
+    accumulate_file() that records parse time in stats and time per column,
+    with two clock reads per column per block.
+    """
+    records = iter_csv_records(file_path)
+    with stats.stage("parse") as counts:
+        header = next(records, None)
+        counts["bytes"] = 0 if is_stdin(file_path) else os.path.getsize(file_path)
+    if header is None:
+        return None
+
+    table = TableAccumulator(header, make_freq)
+    columns = table.columns
+    seconds = [0.0] * len(columns)
+    clock = time.perf_counter
+    block_rows = block_rows_for(header, block_rows)
+    while True:
+        t0 = clock()
+        block = list(islice(records, block_rows))
+        stats.add("parse", clock() - t0, len(block))
+        if not block:
+            break
+
+        t0 = clock()
+        table.update_block(block, seconds)
+        stats.add("accumulate", clock() - t0, len(block))
+
+    stats.set_columns([c.name for c in columns], seconds, [c.total for c in columns])
+    return table
+
+
+def profile_records(
+    header: Sequence[str],
+    records: Iterable[Sequence[str]],
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+) -> Dict[str, Any]:
+    """Profile positional records against a header in one pass."""
+    return accumulate_records(header, records, make_freq).to_profile()
+
+
+def profile_file(file_path: str, make_freq: Callable[[], Any] = FrequencyAccumulator) -> Dict[str, Any]:
+    """
+    Profile a CSV file without materializing its rows.
+    Memory grows with the number of columns (and distinct values),
+    not with the number of rows.
+    """
+    table = accumulate_file(file_path, make_freq)
+    if table is None:
+        return {"rows": 0, "columns": 0, "column_profiles": []}
+    return table.to_profile()
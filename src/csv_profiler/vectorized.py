@@ -0,0 +1,244 @@
+"""
+Columnar pandas/pyarrow engines
+"""
+
+import importlib.util
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .accumulators import ColumnAccumulator, FrequencyAccumulator, TableAccumulator
+from .inference import INTEGER, NUMBER, PARSERS, TEXT, classify, convert, join
+from .io import detect_compression, is_missing, is_stdin, iter_csv_records, leading_blank_lines, open_binary
+from .parallel import accumulate_file_parallel
+from .streaming import accumulate_file
+
+ENGINES = ("python", "pandas", "arrow")
+# engine -> (module it needs, pip extra that provides it)
+ENGINE_REQUIREMENTS = {"pandas": ("pandas", "pandas"), "arrow": ("pyarrow", "arrow")}
+BATCH_ROWS = 1 << 16
+BATCH_BYTES = 16 << 20
+
+
+def missing_requirement(engine: str) -> Optional[str]:
+    """Install hint when the engine's library is not importable, else None."""
+    if engine not in ENGINE_REQUIREMENTS:
+        return None
+    module, extra = ENGINE_REQUIREMENTS[engine]
+    if importlib.util.find_spec(module) is None:
+        return f"the {engine} engine needs {module}: pip install 'csv-profiler[{extra}]'"
+    return None
+
+
+def read_header_record(file_path: str) -> Optional[List[str]]:
+    """First record of a CSV file, or None when it is empty."""
+    records = iter_csv_records(file_path)
+    header = next(records, None)
+    records.close()
+    return header
+
+
+def count_records(file_path: str, width: int) -> Tuple[int, int, int]:
+    """
+    (records, short, long) after the header, from the field count of every
+    record as the python engine reads them. One pass of csv.reader costs
+    a fraction of a pandas read (under a tenth on wide tables).
+    """
+    records = short = long = 0
+    lengths = map(len, iter_csv_records(file_path))
+    next(lengths, None)
+    for n in lengths:
+        records += 1
+        if n < width:
+            short += 1
+        elif n > width:
+            long += 1
+    return records, short, long
+
+
+def update_column(col: ColumnAccumulator, uniques: Sequence[str], codes) -> None:
+    """
+    Fold one batch of a column into its accumulator.
+    uniques are the batch's distinct values in first-seen order and codes
+    index into them per row (-1 for a null cell). Missing detection and
+    type parsing run once per distinct value, everything per row is
+    done with array operations, and the accumulator ends up in the same
+    state as if the cells had been fed one by one.
+    """
+    import numpy as np
+
+    n = len(codes)
+    valid = codes >= 0
+    n_null = n - int(np.count_nonzero(valid))
+    if n_null:
+        codes = codes[valid]
+
+    counts = np.bincount(codes, minlength=len(uniques)).tolist()
+    missing_u = [is_missing(u) for u in uniques]
+
+    col.total += n
+    col.missing += n_null + sum(c for c, m in zip(counts, missing_u) if m)
+
+    freq = col.freq.counts
+    fresh = []
+    for u, c, m in zip(uniques, counts, missing_u):
+        seen = False
+        if not m:
+            old = freq.get(u)
+            seen = old is not None
+            freq[u] = old + c if seen else c
+        fresh.append(not m and not seen)
+
+    kind = col.kind
+    if kind == TEXT:
+        return
+
+    # same narrowing as ColumnAccumulator.update_many, once per distinct value
+    parsed: List[Any] = []
+    for u, m in zip(uniques, missing_u):
+        p = None
+        if not m:
+            p = None if kind is None else PARSERS[kind](u)
+            if p is None:
+                k, p = classify(u)
+                kind = join(kind, k)
+                if kind == TEXT:
+                    col.widen(TEXT)
+                    return
+        parsed.append(p)
+
+    col.widen(kind)
+    if kind is None:
+        return
+    col.freq.add_distinct([convert(kind, p) for p, f in zip(parsed, fresh) if f])
+
+    if kind in (INTEGER, NUMBER):
+        # every cell in file order: exact sums need the floats and the
+        # quantile sketch must see the same stream as update_many() would
+        present = ~np.array(missing_u, dtype=bool)
+        rows = codes[present[codes]]
+        if kind == NUMBER:
+            lookup = np.array([0.0 if p is None else convert(NUMBER, p) for p in parsed], dtype=np.float64)
+        else:
+            lookup = np.array([0 if p is None else p for p in parsed], dtype=object)
+        col.values.add_batch(lookup[rows].tolist())
+    else:
+        keep = [(convert(kind, p), c) for p, c, m in zip(parsed, counts, missing_u) if not m]
+        col.values.add_many([p for p, _ in keep], [c for _, c in keep])
+
+
+def accumulate_file_pandas(file_path: str, batch_rows: int = BATCH_ROWS) -> Optional[TableAccumulator]:
+    """
+    Accumulate a CSV file by reading string column batches with pandas.
+    pandas pads short records with empty fields that look like any other
+    empty cell and cannot read long ones consistently, so the field
+    counts come from a count_records() pass first; files with long
+    records go to the python engine, and so do files where pandas reads
+    a different number of rows (it drops whitespace-only lines, which
+    the csv module reads as one-field records).
+    """
+    import pandas as pd
+
+    header = read_header_record(file_path)
+    if header is None:
+        return None
+
+    records, short, long = count_records(file_path, len(header))
+    if long:
+        return accumulate_file(file_path)
+
+    table = TableAccumulator(header)
+    table.short_rows = short
+    try:
+        reader = pd.read_csv(
+            file_path,
+            header=0,
+            names=list(range(len(header))),
+            index_col=False,
+            dtype=str,
+            keep_default_na=False,
+            na_filter=False,
+            encoding="utf-8",
+            compression=detect_compression(file_path),
+            chunksize=batch_rows,
+        )
+        with reader:
+            for frame in reader:
+                table.rows += len(frame)
+                for col, (_, series) in zip(table.columns, frame.items()):
+                    codes, uniques = pd.factorize(series, sort=False, use_na_sentinel=True)
+                    update_column(col, list(uniques), codes)
+    except pd.errors.ParserError:
+        return accumulate_file(file_path)
+
+    if table.rows != records:
+        return accumulate_file(file_path)
+    return table
+
+
+def accumulate_file_arrow(file_path: str, batch_bytes: int = BATCH_BYTES) -> Optional[TableAccumulator]:
+    """
+    Accumulate a CSV file by streaming Arrow record batches.
+    Ragged records are rejected by the Arrow parser, so such files
+    fall back to the python engine.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    header = read_header_record(file_path)
+    if header is None:
+        return None
+
+    names = [str(i) for i in range(len(header))]
+    # Arrow counts blank lines when skipping, so skip them along with the header
+    blank_lines, _ = leading_blank_lines(file_path)
+    table = TableAccumulator(header)
+    try:
+        # Arrow only infers compression from the file name, so hand it a decompressed stream
+        source = file_path if detect_compression(file_path) is None else open_binary(file_path)
+        reader = pa_csv.open_csv(
+            source,
+            read_options=pa_csv.ReadOptions(column_names=names, skip_rows_after_names=blank_lines + 1, block_size=batch_bytes),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={name: pa.string() for name in names},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+        for batch in reader:
+            table.rows += batch.num_rows
+            for col, arr in zip(table.columns, batch.columns):
+                encoded = arr.dictionary_encode()
+                codes = encoded.indices.to_numpy(zero_copy_only=False)
+                update_column(col, encoded.dictionary.to_pylist(), codes)
+    except pa.ArrowInvalid:
+        return accumulate_file(file_path)
+
+    return table
+
+
+def accumulate_with_engine(
+    file_path: str,
+    engine: str = "python",
+    jobs: int = 1,
+    make_freq: Callable[[], Any] = FrequencyAccumulator,
+) -> Optional[TableAccumulator]:
+    """Dispatch to one of ENGINES; None when the file has no header."""
+    if engine != "python" and is_stdin(file_path):
+        raise ValueError("Reading stdin requires the python engine")
+    if engine == "python":
+        if jobs > 1:
+            return accumulate_file_parallel(file_path, jobs, make_freq)
+        return accumulate_file(file_path, make_freq)
+    if engine == "pandas":
+        return accumulate_file_pandas(file_path)
+    if engine == "arrow":
+        return accumulate_file_arrow(file_path)
+    raise ValueError(f"Unknown engine: {engine}")
+
+
+def profile_with_engine(file_path: str, engine: str) -> Dict[str, Any]:
+    """Profile a CSV file with one of ENGINES."""
+    table = accumulate_with_engine(file_path, engine)
+    if table is None:
+        return {"rows": 0, "columns": 0, "column_profiles": []}
+    return table.to_profile()
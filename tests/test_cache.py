@@ -0,0 +1,111 @@
+import json
+import os
+import pickle
+
+import pytest
+
+from csv_profiler.accumulators import FrequencyAccumulator
+from csv_profiler.cache import APPENDED, HIT, MISS, ProfileCache
+from csv_profiler.streaming import accumulate_file
+
+HEADER = b"id,score,city\n"
+
+
+def rows(start, stop):
+    cities = (b"Riyadh", b"Jeddah", b"", b"Dammam")
+    return b"".join(b"%d,%d.5,%s\n" % (i, i % 13, cities[i % 4]) for i in range(start, stop))
+
+
+def profile(table):
+    return json.dumps(table.to_profile())
+
+
+def run(cache, path):
+    table, status = cache.accumulate(str(path), "exact", accumulate_file, FrequencyAccumulator)
+    # a --no-cache run of the same bytes
+    assert profile(table) == profile(accumulate_file(str(path)))
+    return status
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ProfileCache(tmp_path / "cache")
+
+
+def test_miss_then_hit(tmp_path, cache):
+    path = tmp_path / "data.csv"
+    path.write_bytes(HEADER + rows(0, 500))
+    assert run(cache, path) == MISS
+    assert run(cache, path) == HIT
+
+
+def test_append(tmp_path, cache):
+    path = tmp_path / "data.csv"
+    path.write_bytes(HEADER + rows(0, 500))
+    assert run(cache, path) == MISS
+    with open(path, "ab") as f:
+        f.write(rows(500, 900) + b"x,oops,Riyadh\n")
+    assert run(cache, path) == APPENDED
+    assert run(cache, path) == HIT
+
+
+def test_no_trailing_newline_is_not_appended(tmp_path, cache):
+    path = tmp_path / "data.csv"
+    path.write_bytes(HEADER + rows(0, 500) + b"500,1")
+    assert run(cache, path) == MISS
+    with open(path, "ab") as f:
+        # continues the last record
+        f.write(b"7.5,Jeddah\n" + rows(501, 600))
+    assert run(cache, path) == MISS
+
+
+def test_rewrite_is_a_miss(tmp_path, cache):
+    path = tmp_path / "data.csv"
+    path.write_bytes(HEADER + rows(0, 500))
+    assert run(cache, path) == MISS
+    st = os.stat(path)
+    path.write_bytes(HEADER + rows(1, 501))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert run(cache, path) == MISS
+
+
+def test_settings_and_engine_are_separate_entries(tmp_path, cache):
+    path = str(tmp_path / "data.csv")
+    assert cache.entry_path(path, "exact") != cache.entry_path(path, "approx:14:1024")
+    assert cache.entry_path(path, "exact") != cache.entry_path(path, "exact", "pandas")
+    assert cache.entry_path(path, "exact") != cache.entry_path(path, "exact", jobs=2)
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ProfileCache(tmp_path / "cache")
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"data{i}.csv"
+        path.write_bytes(HEADER + rows(0, 200))
+        paths.append(path)
+    assert run(cache, paths[0]) == MISS
+    assert run(cache, paths[1]) == MISS
+    entries = [cache.entry_path(str(p), "exact") for p in paths]
+    for age, entry in zip((200, 100), entries):
+        os.utime(entry, (os.stat(entry).st_atime - age, os.stat(entry).st_mtime - age))
+    assert run(cache, paths[0]) == HIT  # now the most recently used
+
+    cache.max_bytes = 2 * os.path.getsize(entries[0]) + 1
+    assert run(cache, paths[2]) == MISS
+    assert [e.exists() for e in entries] == [True, False, True]
+
+
+class Exploit:
+    def __reduce__(self):
+        return (os.system, ("true",))
+
+
+def test_foreign_pickle_is_a_miss(tmp_path, cache):
+    path = tmp_path / "data.csv"
+    path.write_bytes(HEADER + rows(0, 100))
+    entry = cache.entry_path(str(path), "exact")
+    entry.parent.mkdir(parents=True)
+    entry.write_bytes(pickle.dumps({"version": 1, "fingerprint": {}, "table": Exploit()}))
+    assert cache.load(entry) is None
+    assert run(cache, path) == MISS
+    assert run(cache, path) == HIT
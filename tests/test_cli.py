@@ -0,0 +1,35 @@
+import gzip
+import json
+
+from typer.testing import CliRunner
+
+from csv_profiler.cli import app
+
+runner = CliRunner()
+
+
+def test_plain_and_compressed_reports_do_not_collide(tmp_path):
+    data = b"a,b\n1,2\n3,4\n"
+    (tmp_path / "s.csv").write_bytes(data)
+    (tmp_path / "s.csv.gz").write_bytes(gzip.compress(data + b"5,6\n"))
+    out = tmp_path / "out"
+    for name in ("s.csv", "s.csv.gz"):
+        result = runner.invoke(app, ["profile", str(tmp_path / name), "--out-dir", str(out), "--format", "json", "--no-cache"])
+        assert result.exit_code == 0, result.output
+    assert sorted(p.name for p in out.iterdir()) == ["profile-s-gz.json", "profile-s.json"]
+
+
+def test_profile_many_shares_approx_settings(tmp_path):
+    (tmp_path / "s.csv").write_bytes(b"a,b\n1,x\n2,y\n3,x\n4,z\n")
+    common = ["--format", "json", "--approx", "--approx-capacity", "2", "--cache-dir", str(tmp_path / "cache")]
+    result = runner.invoke(app, ["profile", str(tmp_path / "s.csv"), "--out-dir", str(tmp_path / "one"), *common])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(app, ["profile-many", str(tmp_path / "s.csv"), "--out-dir", str(tmp_path / "many"), "--jobs", "1", *common])
+    assert result.exit_code == 0, result.output
+
+    index = json.loads((tmp_path / "many" / "index.json").read_text())
+    assert [(e["settings"], e["cache"]) for e in index["entries"]] == [("approx:14:2", "hit")]
+    assert (tmp_path / "many" / "profile-s.json").read_text() == (tmp_path / "one" / "profile-s.json").read_text()
+
+    result = runner.invoke(app, ["profile-many", str(tmp_path / "s.csv"), "--approx", "--approx-precision", "3"])
+    assert result.exit_code != 0
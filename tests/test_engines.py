@@ -0,0 +1,70 @@
+import gzip
+import json
+
+import pytest
+
+from csv_profiler.streaming import accumulate_file
+from csv_profiler.vectorized import accumulate_file_arrow, accumulate_file_pandas, profile_with_engine
+
+pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+ENGINES = ("python", "pandas", "arrow")
+
+CASES = {
+    "quoted_newline": b'id,note,score\n1,"line one\nline two",3.5\n2,"say ""hi""",4\n3,,x\n',
+    "crlf": b"id,city,flag\r\n1,Riyadh,true\r\n2,,false\r\n3,Jeddah,\r\n",
+    "short_rows": b"a,b,c\n1,2,3\n4,5\n6\n7,,\n",
+    "long_rows": b"a,b\n1,2\n3,4,5\n6,7\n",
+    "long_first_row": b"a,b\n1,2,3\n4,5\n",
+    "whitespace_lines": b"a,b\n1,2\n   \n\n3,4\n \t\n",
+    "whitespace_lines_one_column": b"a\n1\n   \n\n2\n",
+    "long_first_row_and_blank": b"a,b\n1,2,3\n4,5\n   \n",
+    "empty": b"",
+    "header_only": b"a,b,c\n",
+    "blank_lines": b"\n\r\n\na,b\n1,2\n\n3,4\n",
+    "mixed_kinds": b"n,d,t\n1,2024-01-02,x\n2.5,2024-01-03T10:00:00,y\nNaN,,z\n1e400,2024-01-05,x\n",
+}
+
+
+def profiles(path):
+    return {engine: json.dumps(profile_with_engine(str(path), engine), ensure_ascii=False) for engine in ENGINES}
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_engines_agree(tmp_path, name):
+    path = tmp_path / f"{name}.csv"
+    path.write_bytes(CASES[name])
+    out = profiles(path)
+    assert out["pandas"] == out["python"]
+    assert out["arrow"] == out["python"]
+
+
+def test_engines_agree_on_gzip(tmp_path):
+    path = tmp_path / "data.csv.gz"
+    path.write_bytes(gzip.compress(CASES["quoted_newline"] + b"4,plain,5\n" * 100))
+    out = profiles(path)
+    assert out["pandas"] == out["python"] == out["arrow"]
+
+
+@pytest.mark.parametrize("name, short, long", [
+    ("short_rows", 2, 0),
+    ("long_rows", 0, 1),
+    ("long_first_row", 0, 1),
+    ("whitespace_lines", 2, 0),
+    ("quoted_newline", 0, 0),
+])
+def test_ragged_counts(tmp_path, name, short, long):
+    path = tmp_path / f"{name}.csv"
+    path.write_bytes(CASES[name])
+    for engine in ENGINES:
+        assert profile_with_engine(str(path), engine)["ragged_rows"] == {"short": short, "long": long}
+
+
+def test_small_batches(tmp_path):
+    # values that widen the column kind in a later batch than they first appear
+    path = tmp_path / "batches.csv"
+    path.write_bytes(b"a,b\n" + b"".join(b"%d,%d\n" % (i, i % 7) for i in range(50)) + b"x,2.5\n1,\n")
+    expected = json.dumps(accumulate_file(str(path)).to_profile())
+    assert json.dumps(accumulate_file_pandas(str(path), batch_rows=8).to_profile()) == expected
+    assert json.dumps(accumulate_file_arrow(str(path), batch_bytes=64).to_profile()) == expected
@@ -0,0 +1,118 @@
+import json
+import random
+
+import pytest
+
+from csv_profiler.accumulators import ColumnAccumulator, TableAccumulator
+from csv_profiler.inference import BOOLEAN, DATE, DATETIME, INTEGER, KINDS, NUMBER, TEXT, classify, join
+
+
+@pytest.mark.parametrize("value, kind", [
+    ("Yes", BOOLEAN),
+    ("-12", INTEGER),
+    ("1e3", NUMBER),
+    ("nan", NUMBER),
+    ("2024-02-29", DATE),
+    ("2024-02-29T10:00:00+03:00", DATETIME),
+    ("2023-02-29", TEXT),
+    ("12 apples", TEXT),
+])
+def test_classify(value, kind):
+    assert classify(value)[0] == kind
+
+
+def test_join():
+    for kind in KINDS:
+        assert join(None, kind) == join(kind, None) == join(kind, kind) == kind
+        assert join(kind, TEXT) == TEXT
+    assert join(INTEGER, NUMBER) == join(NUMBER, INTEGER) == NUMBER
+    assert join(DATE, DATETIME) == join(DATETIME, DATE) == DATETIME
+    # widening never reinterprets earlier values
+    for a, b in [(BOOLEAN, INTEGER), (INTEGER, DATE), (NUMBER, DATETIME)]:
+        assert join(a, b) == join(b, a) == TEXT
+
+
+def column(values, block=None):
+    col = ColumnAccumulator("x")
+    block = block or len(values)
+    for i in range(0, len(values), block):
+        col.update_many(values[i:i + block])
+    return col
+
+
+@pytest.mark.parametrize("values, kind", [
+    (["true", "", "no"], BOOLEAN),
+    (["1", "2", "3"], INTEGER),
+    (["1", "2", "2.5"], NUMBER),
+    (["2024-01-01", "2024-01-02T10:00"], DATETIME),
+    (["true", "1"], TEXT),
+    (["1", "2.5", "2024-01-01"], TEXT),
+    (["2024-01-01", "x"], TEXT),
+])
+def test_widening(values, kind):
+    for block in (1, 2, None):
+        assert column(values, block).kind == kind
+
+
+def test_widened_state_keeps_earlier_values():
+    col = column(["3", "1", "2.5", "10"])
+    profile = col.to_profile()
+    assert profile["type"] == NUMBER
+    assert (profile["min"], profile["max"], profile["mean"], profile["unique"]) == (1, 10, 4.125, 4)
+
+    col = column(["2024-01-02", "2024-01-01", "2024-01-01T12:00"])
+    profile = col.to_profile()
+    assert (profile["min"], profile["max"]) == ("2024-01-01T00:00:00", "2024-01-02T00:00:00")
+    assert profile["unique"] == 3
+
+    # "1" and "1.0" are one number, and "01" the same integer
+    assert column(["1", "01", "1.0"]).to_profile()["unique"] == 1
+
+
+def test_text_keeps_raw_counts():
+    profile = column(["1", "1", "2.5", "x", "1", "NULL"]).to_profile()
+    assert profile["type"] == TEXT
+    assert profile["missing"] == 1
+    assert profile["top"][0] == {"value": "1", "count": 3}
+    assert profile["unique"] == 3
+
+
+def random_records(rng, n):
+    kinds = [
+        lambda: rng.choice(["true", "false", ""]),
+        lambda: str(rng.randrange(-50, 50)),
+        lambda: rng.choice([str(rng.randrange(100)), f"{rng.random():.3f}"]),
+        lambda: f"2024-01-{rng.randrange(1, 29):02d}" + rng.choice(["", "", "T08:30:00"]),
+        lambda: rng.choice([str(rng.randrange(9)), "2024-01-01", "n/a", "x"]),
+    ]
+    return [[make() for make in kinds] for _ in range(n)]
+
+
+def profile_blocks(records, block):
+    table = TableAccumulator(["b", "i", "n", "d", "t"])
+    for i in range(0, len(records), block):
+        table.update_block(records[i:i + block])
+    return json.dumps(table.to_profile())
+
+
+def test_block_size_invariance():
+    # the kind can widen in any block, or within one
+    records = random_records(random.Random(5), 150)
+    expected = profile_blocks(records, len(records))
+    for block in (1, 2, 7, 64):
+        assert profile_blocks(records, block) == expected
+
+
+def test_merge_invariance():
+    # under the KLL compaction size, so quantiles are exact too
+    records = random_records(random.Random(7), 150)
+    expected = profile_blocks(records, len(records))
+    for cuts in ([1], [40, 41, 120], [75]):
+        parts = []
+        for a, b in zip([0] + cuts, cuts + [len(records)]):
+            part = TableAccumulator(["b", "i", "n", "d", "t"])
+            part.update_block(records[a:b])
+            parts.append(part)
+        for part in parts[1:]:
+            parts[0].merge(part)
+        assert json.dumps(parts[0].to_profile()) == expected, cuts
@@ -0,0 +1,23 @@
+from csv_profiler.accumulators import TableAccumulator
+from csv_profiler.instrument import Stats, deep_size
+
+
+def table(rows):
+    t = TableAccumulator(["id", "flag"])
+    t.update_block([[str(i), "true"] for i in range(rows)])
+    return t
+
+
+def test_deep_size_follows_slots_and_containers():
+    small, large = table(10), table(10_000)
+    assert deep_size(large.columns[0]) > deep_size(small.columns[0]) + 10_000 * 40
+    # a boolean column holds two counters, whatever the row count
+    assert deep_size(large.columns[1]) < 2 * deep_size(small.columns[1])
+
+
+def test_column_memory_without_timings():
+    stats = Stats()
+    stats.set_column_memory(table(100).columns)
+    assert [c["name"] for c in stats.columns] == ["id", "flag"]
+    assert all(c["state_mb"] > 0 and c["cells"] == 100 for c in stats.columns)
+    assert "state MB" in stats.format_table()
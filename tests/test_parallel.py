@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from csv_profiler import parallel
+from csv_profiler.io import find_record_boundaries
+from csv_profiler.parallel import accumulate_file_parallel, read_header, split_chunks
+from csv_profiler.streaming import accumulate_file
+
+
+def quoted_rows(n):
+    # quoted newlines, escaped "" quotes and a quote-heavy field, under the
+    # KLL compaction size so merged quantiles are exact
+    notes = (b'"multi\nline ""quoted"" note"', b"plain", b'""', b'"a,b\r\nc"', b'"""x"""')
+    return b"".join(b'%d,%s,%d.25\n' % (i, notes[i % len(notes)], i % 9) for i in range(n))
+
+
+FILES = {
+    "quoted": b"id,note,score\n" + quoted_rows(150),
+    "blank_lines": b"\n\r\n\nid,note,score\n" + quoted_rows(120),
+    "crlf": (b"id,note,score\n" + quoted_rows(100)).replace(b"plain\n", b"plain\r\n"),
+    "no_trailing_newline": b"id,note,score\n" + quoted_rows(90) + b'90,"last\nrecord",1',
+}
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # split even small files into many chunks
+    monkeypatch.setattr(parallel, "MIN_CHUNK_BYTES", 64)
+
+
+@pytest.mark.parametrize("name", sorted(FILES))
+def test_jobs_give_the_same_profile(tmp_path, name):
+    path = tmp_path / f"{name}.csv"
+    path.write_bytes(FILES[name])
+    expected = json.dumps(accumulate_file(str(path)).to_profile())
+    for jobs in (1, 2, 3, 7):
+        assert json.dumps(accumulate_file_parallel(str(path), jobs).to_profile()) == expected, jobs
+
+
+@pytest.mark.parametrize("name", sorted(FILES))
+def test_chunks_start_on_records(tmp_path, name):
+    path = tmp_path / f"{name}.csv"
+    path.write_bytes(FILES[name])
+    data = FILES[name]
+    header, start = read_header(str(path))
+    assert header == ["id", "note", "score"]
+    chunks = split_chunks(str(path), 13, start)
+    assert chunks[0][0] == start and chunks[-1][1] == len(data)
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:]))
+    for a, _ in chunks:
+        # every cut follows a newline outside quotes
+        assert data[a - 1:a] == b"\n" and data[:a].count(b'"') % 2 == 0
+
+
+def test_find_record_boundaries(tmp_path):
+    data = b'a,b\n1,"x\ny"\n2,""""\n3,z\n'
+    path = tmp_path / "data.csv"
+    path.write_bytes(data)
+    inside = data.index(b"y")
+    after = data.index(b"2,")
+    # a record start maps to the start of the next record
+    assert find_record_boundaries(str(path), [0, 4, inside, after - 1]) == [4, after, after, after]
+    assert find_record_boundaries(str(path), [len(data) - 2, len(data) + 5]) == [len(data), len(data)]
+    # a small block size makes quotes and boundaries span blocks
+    targets = list(range(len(data)))
+    assert find_record_boundaries(str(path), targets, block_size=3) == find_record_boundaries(str(path), targets)
@@ -0,0 +1,124 @@
+import gzip
+import random
+
+import pytest
+
+from csv_profiler.sampling import bernoulli_sample, mean_interval, profile_sample, reservoir_sample, wilson_interval
+
+ROWS = 2000
+
+
+@pytest.fixture(scope="module")
+def data(tmp_path_factory):
+    """A file with known missing share and mean, and one malformed value near the end."""
+    rng = random.Random(0)
+    scores = [rng.gauss(50, 10) for _ in range(ROWS)]
+    notes = ["" if rng.random() < 0.2 else rng.choice(["a", "bb", '"c,\nd"']) for _ in range(ROWS)]
+    codes = [str(i % 97) for i in range(ROWS)]
+    codes[-3] = "n/a?"
+    path = tmp_path_factory.mktemp("sampling") / "data.csv"
+    path.write_text("id,score,note,code\n" + "".join(
+        f"{i},{s:.4f},{n},{c}\n" for i, (s, n, c) in enumerate(zip(scores, notes, codes))
+    ))
+    truth = {
+        "missing_pct": 100.0 * notes.count("") / ROWS,
+        "mean": sum(float(f"{s:.4f}") for s in scores) / ROWS,
+    }
+    return str(path), truth
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) is None
+    lo, hi = wilson_interval(0, 10)
+    assert lo == 0.0 and hi == pytest.approx(0.2775, abs=1e-4)
+    lo, hi = wilson_interval(50, 100)
+    assert (lo, hi) == pytest.approx((0.4038, 0.5962), abs=1e-4)
+    assert wilson_interval(10, 10)[1] == 1.0
+
+
+def test_mean_interval():
+    assert mean_interval(1.0, None, 10) is None
+    assert mean_interval(1.0, 2.0, 1) is None
+    lo, hi = mean_interval(10.0, 2.0, 100)
+    assert (hi - lo) / 2 == pytest.approx(1.96 * 0.2, rel=1e-3)
+    # the finite population correction shrinks the interval to nothing for a full sample
+    assert mean_interval(10.0, 2.0, 100, population=100) == [10.0, 10.0]
+    narrower = mean_interval(10.0, 2.0, 100, population=200)
+    assert narrower[1] - narrower[0] < hi - lo
+
+
+def test_reservoir_sample_is_uniform():
+    hits = [0] * 20
+    for seed in range(2000):
+        sample, seen = reservoir_sample(([i] for i in range(20)), 5, random.Random(seed))
+        assert seen == 20 and len(sample) == 5 and sample == sorted(sample)
+        for (i,) in sample:
+            hits[i] += 1
+    # each record is drawn with probability 5/20
+    assert all(abs(h / 2000 - 0.25) < 0.05 for h in hits)
+
+
+def test_bernoulli_sample_counts_records():
+    counts = {}
+    sample = list(bernoulli_sample(([i] for i in range(10_000)), 0.1, random.Random(1), counts))
+    assert counts["seen"] == 10_000
+    assert abs(len(sample) - 1000) < 100
+
+
+@pytest.mark.parametrize("options", [{"size": 200}, {"fraction": 0.1}])
+@pytest.mark.parametrize("mode", ["reservoir", "seek"])
+def test_confidence_interval_coverage(data, mode, options):
+    path, truth = data
+    trials = 40
+    covered = {"missing_pct": 0, "mean": 0}
+    for seed in range(trials):
+        profile = profile_sample(path, mode=mode, seed=seed, **options)
+        cols = {c["name"]: c for c in profile["column_profiles"]}
+        lo, hi = cols["note"]["ci"]["missing_pct"]
+        covered["missing_pct"] += lo <= truth["missing_pct"] <= hi
+        lo, hi = cols["score"]["ci"]["mean"]
+        covered["mean"] += lo <= truth["mean"] <= hi
+    # 95% intervals; allow for the spread of 40 trials
+    assert all(c >= 0.85 * trials for c in covered.values()), covered
+
+
+def test_sample_section(data):
+    path, _ = data
+    profile = profile_sample(path, size=300, seed=1)
+    assert profile["rows"] == profile["sample"]["rows_sampled"] == 300
+    assert profile["sample"]["rows_total"] == ROWS
+
+    profile = profile_sample(path, fraction=0.25, mode="seek", seed=1)
+    sample = profile["sample"]
+    assert sample["rows_total"] is None
+    assert abs(sample["rows_estimated"] - ROWS) < 0.1 * ROWS
+    assert abs(sample["rows_sampled"] - 0.25 * ROWS) < 0.05 * ROWS
+
+    assert profile_sample(path, size=ROWS + 10, seed=1)["rows"] == ROWS
+
+
+def kinds(profile):
+    return {c["name"]: c["type"] for c in profile["column_profiles"]}
+
+
+@pytest.mark.parametrize("mode", ["reservoir", "seek"])
+def test_validate_widens_kinds(data, mode):
+    path, _ = data
+    assert kinds(profile_sample(path, size=50, mode=mode, seed=2))["code"] == "integer"
+    profile = profile_sample(path, size=50, mode=mode, seed=2, validate=True)
+    assert kinds(profile)["code"] == "text"
+    assert profile["sample"]["types_validated"] is True
+
+
+def test_bad_arguments(data, tmp_path):
+    path, _ = data
+    with pytest.raises(ValueError, match="exactly one"):
+        profile_sample(path)
+    with pytest.raises(ValueError, match="exactly one"):
+        profile_sample(path, size=10, fraction=0.5)
+    with pytest.raises(ValueError, match="Unknown sample mode"):
+        profile_sample(path, size=10, mode="stride")
+    compressed = tmp_path / "data.csv.gz"
+    compressed.write_bytes(gzip.compress(b"a\n1\n"))
+    with pytest.raises(ValueError, match="uncompressed"):
+        profile_sample(str(compressed), size=10, mode="seek")
@@ -0,0 +1,208 @@
+import asyncio
+import io
+import json
+import os
+import signal
+import socket
+import threading
+
+import pytest
+
+from csv_profiler.io import read_csv_rows
+from csv_profiler.profiling import profile_rows
+from csv_profiler.server import ProfileService, ServiceClient
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "data", "sample.csv")
+TIMEOUT = 60
+
+
+class Running:
+    """A ProfileService on its own event loop thread, with a client for it."""
+
+    def __init__(self, host="127.0.0.1", unix_socket=None, **options):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.service = self.call(self._start(host, unix_socket, options))
+        if unix_socket:
+            self.client = ServiceClient(unix_socket=unix_socket, timeout=TIMEOUT)
+        else:
+            port = self.service.server.sockets[0].getsockname()[1]
+            self.client = ServiceClient("127.0.0.1", port, timeout=TIMEOUT)
+
+    async def _start(self, host, unix_socket, options):
+        service = ProfileService(**options)
+        await service.start(host, 0, unix_socket)
+        return service
+
+    def call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(TIMEOUT)
+
+    def close(self):
+        self.call(self.service.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(TIMEOUT)
+        self.loop.close()
+
+
+@pytest.fixture
+def spool(tmp_path):
+    path = tmp_path / "spool"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def running(spool):
+    server = Running(spool_dir=str(spool))
+    yield server
+    server.close()
+
+
+def expected_profile():
+    # the service answers with JSON, so compare JSON values
+    return json.loads(json.dumps(profile_rows(read_csv_rows(SAMPLE))))
+
+
+def test_path_and_upload_match_profile_rows(running, spool):
+    status, result = running.client.submit_path(SAMPLE, wait=True)
+    assert status == 200
+    assert result == expected_profile()
+
+    with open(SAMPLE, "rb") as f:
+        status, result = running.client.submit_stream(f, wait=True)
+    assert status == 200
+    assert result == expected_profile()
+    assert list(spool.iterdir()) == []
+
+
+def test_unix_socket(tmp_path, spool):
+    server = Running(unix_socket=str(tmp_path / "service.sock"), spool_dir=str(spool))
+    try:
+        status, result = server.client.submit_path(SAMPLE, wait=True)
+        assert status == 200
+        assert result == expected_profile()
+        status, health = server.client.request("GET", "/health")
+        assert status == 200 and health["workers"] == 1
+    finally:
+        server.close()
+
+
+def test_events_stream(running):
+    status, job = running.client.submit_path(SAMPLE)
+    assert status == 202
+    events = list(running.client.events(job["id"]))
+    assert {e["id"] for e in events} == {job["id"]}
+    assert events[-1]["status"] == "done"
+    assert events[-1]["rows"] == expected_profile()["rows"]
+    assert all(e["status"] in ("queued", "running") for e in events[:-1])
+
+    status, result = running.client.result(job["id"])
+    assert status == 200 and result == expected_profile()
+
+
+def test_upload_too_large(spool):
+    server = Running(spool_dir=str(spool), max_upload_mb=1)
+    try:
+        status, body = server.client.submit_stream(io.BytesIO(b"a,b\n" + b"1,2\n" * (300 << 10)))
+        assert status == 413
+        assert "too large" in body["error"]
+        assert list(spool.iterdir()) == []
+    finally:
+        server.close()
+
+
+def test_queue_full(spool):
+    server = Running(spool_dir=str(spool), queue_size=1)
+    try:
+        # stop the dispatcher so queued jobs stay queued
+        for task in server.service.tasks:
+            server.loop.call_soon_threadsafe(task.cancel)
+        server.call(asyncio.sleep(0.1))
+
+        with open(SAMPLE, "rb") as f:
+            status, job = server.client.submit_stream(f)
+        assert status == 202 and job["status"] == "queued"
+        status, body = server.client.submit_path(SAMPLE)
+        assert status == 503
+        with open(SAMPLE, "rb") as f:
+            status, body = server.client.submit_stream(f)
+        assert status == 503
+        # only the queued upload is spooled, until the service closes
+        assert len(list(spool.iterdir())) == 1
+    finally:
+        server.close()
+    assert list(spool.iterdir()) == []
+
+
+def test_failed_job_removes_upload(running, spool):
+    status, body = running.client.submit_stream(io.BytesIO(b"a,b\n\xff\xfe,1\n"), wait=True)
+    assert status == 500
+    assert body["job"]["status"] == "failed"
+    assert list(spool.iterdir()) == []
+
+
+def test_path_jobs_limited_to_roots(tmp_path, spool):
+    inside = tmp_path / "data"
+    inside.mkdir()
+    (inside / "ok.csv").write_bytes(b"a\n1\n")
+    outside = tmp_path / "secret.csv"
+    outside.write_bytes(b"a\n2\n")
+    (inside / "link.csv").symlink_to(outside)
+
+    server = Running(spool_dir=str(spool), roots=[str(inside)])
+    try:
+        status, _ = server.client.submit_path(str(inside / "ok.csv"), wait=True)
+        assert status == 200
+        for path in (outside, inside / "link.csv", inside / ".." / "secret.csv"):
+            status, body = server.client.submit_path(str(path))
+            assert status == 403, path
+    finally:
+        server.close()
+
+
+def test_path_jobs_refused_off_loopback(spool):
+    server = Running(host="0.0.0.0", spool_dir=str(spool))
+    try:
+        status, body = server.client.submit_path(SAMPLE)
+        assert status == 403
+        assert "--root" in body["error"]
+        with open(SAMPLE, "rb") as f:
+            status, _ = server.client.submit_stream(f, wait=True)
+        assert status == 200
+    finally:
+        server.close()
+
+
+def raw_request(running, data):
+    port = running.service.server.sockets[0].getsockname()[1]
+    with socket.create_connection(("127.0.0.1", port), timeout=TIMEOUT) as sock:
+        sock.sendall(data)
+        sock.shutdown(socket.SHUT_WR)
+        response = b"".join(iter(lambda: sock.recv(1 << 16), b""))
+    return int(response.split(b" ", 2)[1])
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5", b"1e3"])
+def test_bad_content_length(running, length):
+    request = b"POST /jobs HTTP/1.1\r\nContent-Type: text/csv\r\nContent-Length: " + length + b"\r\n\r\na,b\n"
+    assert raw_request(running, request) == 400
+
+
+def test_approx_needs_python_engine(running):
+    status, body = running.client.submit_path(SAMPLE, engine="pandas", approx=True)
+    assert status == 400
+    with open(SAMPLE, "rb") as f:
+        status, body = running.client.submit_stream(f, engine="arrow", approx=True)
+    assert status == 400
+
+
+def test_dead_worker_is_replaced(running):
+    for pid in list(running.service.pool._processes):
+        os.kill(pid, signal.SIGKILL)
+    status, body = running.client.submit_path(SAMPLE, wait=True)
+    assert status == 500
+    assert "worker process died" in body["error"]
+    status, result = running.client.submit_path(SAMPLE, wait=True)
+    assert status == 200
+    assert result == expected_profile()
@@ -0,0 +1,147 @@
+import random
+from collections import Counter
+from datetime import date, datetime
+
+import pytest
+
+from csv_profiler.sketches import KLL, HyperLogLog, SketchFrequency, SpaceSaving, canonical_bytes
+
+N = 100_000
+QS = [i / 100 for i in range(1, 100)]
+
+
+def shuffled(n, seed):
+    values = list(range(n))
+    random.Random(seed).shuffle(values)
+    return values
+
+
+def rank_error(sketch, n):
+    return max(abs(v / n - q) for q, v in zip(QS, sketch.quantiles(QS)))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_kll_rank_error(seed):
+    values = shuffled(N, seed)
+    sketch = KLL()
+    sketch.add_batch(values)
+    assert rank_error(sketch, N) <= 1.7 / sketch.k
+    assert sum(map(len, sketch.levels)) < 4 * sketch.k
+
+    parts = [KLL() for _ in range(7)]
+    for i, part in enumerate(parts):
+        part.add_batch(values[i::7])
+    for part in parts[1:]:
+        parts[0].merge(part)
+    assert rank_error(parts[0], N) <= 1.7 / sketch.k
+
+
+def test_kll_is_exact_while_small():
+    sketch = KLL()
+    sketch.add_batch([5, 1, 4, 2, 3])
+    assert sketch.quantiles([0.0, 0.2, 0.5, 1.0]) == [1, 1, 3, 5]
+    assert KLL().quantiles([0.5]) == [None]
+
+
+def test_kll_batch_size_invariance():
+    values = shuffled(20_000, 3)
+    whole = KLL()
+    whole.add_batch(values)
+    for size in (1, 7, 1000):
+        sketch = KLL()
+        for i in range(0, len(values), size):
+            sketch.add_batch(values[i:i + size])
+        assert sketch.levels == whole.levels, size
+
+
+def test_kll_ks_distance_and_histogram():
+    a, b = KLL(), KLL()
+    a.add_batch(shuffled(N, 1))
+    b.add_batch([x + N // 10 for x in shuffled(N, 2)])
+    assert a.ks_distance(a) == 0.0
+    assert abs(a.ks_distance(b) - 0.1) <= 2 * 1.7 / a.k
+    assert a.ks_distance(KLL()) is None
+
+    hist = a.histogram(0, N, 10)
+    assert sum(hist["counts"]) == N
+    assert all(abs(c - N / 10) <= 1.7 / a.k * N * 2 for c in hist["counts"])
+
+
+@pytest.mark.parametrize("n", [10, 1000, N])
+def test_hll_estimate(n):
+    sketch = HyperLogLog()
+    items = [b"item-%d" % i for i in range(n)]
+    sketch.add_many(items + items[: n // 2])
+    assert abs(sketch.estimate() - n) <= 3 * sketch.std_error() * n + 1
+
+
+def test_hll_merge_is_union():
+    items = [b"%d" % i for i in range(20_000)]
+    whole, a, b = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    whole.add_many(items)
+    a.add_many(items[:12_000])
+    b.add_many(items[8_000:])
+    a.merge(b)
+    assert a.registers == whole.registers
+    with pytest.raises(ValueError):
+        a.merge(HyperLogLog(12))
+
+
+def zipf_stream(n, seed):
+    rng = random.Random(seed)
+    weights = [1 / r for r in range(1, 5001)]
+    return [f"v{i}" for i in rng.choices(range(5000), weights, k=n)]
+
+
+def check_space_saving(sketch, true):
+    n = sum(true.values())
+    for item, count in sketch.counts.items():
+        assert count - sketch.errors[item] <= true[item] <= count
+    floor = sketch.min_count()
+    assert all(c <= floor for item, c in true.items() if item not in sketch.counts)
+    # anything above n / capacity is always tracked
+    assert all(item in sketch.counts for item, c in true.items() if c > n / sketch.capacity)
+
+
+def test_space_saving_bounds():
+    stream = zipf_stream(50_000, 1)
+    sketch = SpaceSaving(200)
+    fresh = sketch.add_many(stream)
+    assert len(sketch.counts) == 200
+    assert fresh[0] == 0 and len(fresh) < len(stream)
+    check_space_saving(sketch, Counter(stream))
+    assert [t["value"] for t in sketch.top(3)] == ["v0", "v1", "v2"]
+
+
+def test_space_saving_merge_bounds():
+    a_stream, b_stream = zipf_stream(30_000, 2), zipf_stream(20_000, 3)
+    a, b = SpaceSaving(200), SpaceSaving(200)
+    a.add_many(a_stream)
+    b.add_many(b_stream)
+    a.merge(b)
+    assert len(a.counts) == 200
+    check_space_saving(a, Counter(a_stream + b_stream))
+
+
+def test_space_saving_is_exact_under_capacity():
+    sketch = SpaceSaving(10)
+    sketch.add_many(list("abracadabra"))
+    assert sketch.counts == dict(Counter("abracadabra"))
+    assert set(sketch.errors.values()) == {0} and sketch.min_count() == 0
+
+
+def test_canonical_bytes_survive_widening():
+    assert canonical_bytes(1) == canonical_bytes(1.0)
+    assert canonical_bytes(0) == canonical_bytes(-0.0)
+    assert canonical_bytes(date(2024, 1, 2)) == canonical_bytes(datetime(2024, 1, 2))
+    assert canonical_bytes(10 ** 400) != canonical_bytes(10 ** 400 + 1)
+
+
+def test_sketch_frequency():
+    freq = SketchFrequency(14, 64)
+    values = [str(i % 5000) for i in range(20_000)]
+    freq.add_many(values, [int(v) for v in values])
+    for unique in (freq.unique(), freq.unique_parsed()):
+        assert abs(unique - 5000) <= 3 * freq.distinct.std_error() * 5000
+    assert freq.error_bounds(typed=False)["top_max_error"] == freq.heavy.min_count()
+    assert "top_max_error" not in freq.error_bounds(typed=True)
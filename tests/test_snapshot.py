@@ -0,0 +1,64 @@
+import os
+import pickle
+import zlib
+
+import pytest
+
+from csv_profiler import snapshot
+from csv_profiler.diff import diff_profiles, quantile_ks
+from csv_profiler.streaming import accumulate_file
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "..", "data", "sample.csv")
+
+
+class Exploit:
+    def __reduce__(self):
+        return (os.system, ("true",))
+
+
+def write(tmp_path, name="p.cprof"):
+    table = accumulate_file(SAMPLE)
+    path = str(tmp_path / name)
+    snapshot.write_snapshot(table.to_profile(), table, path, {"file": SAMPLE})
+    return path, table
+
+
+def rewrite_state(path, state: bytes) -> None:
+    with open(path, "rb") as f:
+        raw = f.read()
+    _, _, head_len = snapshot._HEADER.unpack_from(raw)
+    with open(path, "wb") as f:
+        f.write(raw[:snapshot._HEADER.size + head_len] + state)
+
+
+def test_round_trip(tmp_path):
+    path, table = write(tmp_path)
+    loaded = snapshot.read_snapshot(path)
+    assert loaded["profile"] == table.to_profile()
+    assert loaded["source"] == {"file": SAMPLE}
+    assert loaded["table"].to_profile() == table.to_profile()
+    assert snapshot.read_snapshot(path, state=False)["table"] is None
+
+
+def test_other_state_version_is_skipped(tmp_path):
+    path, table = write(tmp_path)
+    rewrite_state(path, bytes([snapshot.STATE_VERSION + 1]) + b"not a pickle")
+    loaded = snapshot.read_snapshot(path)
+    assert loaded["table"] is None
+    diff = diff_profiles(loaded, snapshot.read_snapshot(write(tmp_path, "q.cprof")[0]))
+    assert diff["changes"] == []
+
+
+def test_state_cannot_run_code(tmp_path):
+    path, _ = write(tmp_path)
+    rewrite_state(path, bytes([snapshot.STATE_VERSION]) + zlib.compress(pickle.dumps(Exploit())))
+    with pytest.raises(ValueError, match="not allowed"):
+        snapshot.read_snapshot(path)
+
+
+
+def test_quantile_drift_with_huge_integers():
+    old = {"min": 1, "max": 10 ** 400, "quantiles": {"p50": 5}}
+    new = {"min": 1, "max": 10, "quantiles": {"p50": 5}}
+    assert quantile_ks(old, new) is None
+    assert quantile_ks(new, new) == 0.0
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+# Optional dependencies that only the commands using them may import.
+HEAVY = ("pandas", "numpy", "pyarrow", "streamlit", "rich")
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds per module, from python -X importtime."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(SRC), env.get("PYTHONPATH")) if p)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_skips_heavy_dependencies():
+    times = import_times("csv_profiler.cli")
+    eager = sorted({name.split(".")[0] for name in times} & set(HEAVY))
+    assert eager == []
+
+
+def test_cli_import_time_is_close_to_typer():
+    # relative to typer, which the CLI cannot avoid, so slow machines do not fail it;
+    # one heavy dependency alone takes several times typer's import
+    runs = [import_times("csv_profiler.cli") for _ in range(3)]
+    best = min(runs, key=lambda t: t["csv_profiler.cli"])
+    assert best["csv_profiler.cli"] < 3 * best["typer"]